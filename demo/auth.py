@@ -1,6 +1,5 @@
 from __future__ import annotations as _annotations
 
-import asyncio
 import json
 import os
 from dataclasses import asdict
@@ -155,9 +154,7 @@ async def github_redirect(
     github_auth: Annotated[GitHubAuthProvider, Depends(get_github_auth)],
 ) -> list[AnyComponent]:
     exchange = await github_auth.exchange_code(code, state)
-    user_info, emails = await asyncio.gather(
-        github_auth.get_github_user(exchange), github_auth.get_github_user_emails(exchange)
-    )
+    user_info, emails = await github_auth.get_github_identity(exchange)
     user = User(
         email=next((e.email for e in emails if e.primary and e.verified), None),
         extra={
@@ -3,26 +3,27 @@ from collections.abc import AsyncIterable
 from itertools import chain
 
 from fastapi import APIRouter
-from fastui import FastUI
+from fastui import AnyComponent
 from fastui import components as c
+from fastui.sse import sse_response
 from starlette.responses import StreamingResponse
 
 router = APIRouter()
 
 
-async def canned_ai_response_generator() -> AsyncIterable[str]:
+async def canned_ai_response_generator() -> AsyncIterable[list[AnyComponent]]:
     prompt = '**User:** What is SSE? Please include a javascript code example.\n\n**AI:** '
     output = ''
     for time, text in chain([(0.5, prompt)], CANNED_RESPONSE):
         await asyncio.sleep(time)
         output += text
-        m = FastUI(root=[c.Markdown(text=output)])
-        yield f'data: {m.model_dump_json(by_alias=True, exclude_none=True)}\n\n'
+        yield [c.Markdown(text=output)]
 
 
 @router.get('/sse')
 async def sse_ai_response() -> StreamingResponse:
-    return StreamingResponse(canned_ai_response_generator(), media_type='text/event-stream')
+    # after the first event, only the new text is sent
+    return sse_response(canned_ai_response_generator())
 
 
 async def run_openai():
@@ -8,6 +8,7 @@ from fastui import AnyComponent, FastUI
 from fastui import components as c
 from fastui.components.display import DisplayLookup, DisplayMode
 from fastui.events import BackEvent, GoToEvent
+from fastui.pagination import paginate
 from pydantic import BaseModel, Field, TypeAdapter
 
 from .shared import demo_page
@@ -49,13 +50,20 @@ class FilterForm(pydantic.BaseModel):
 
 @router.get('/cities', response_model=FastUI, response_model_exclude_none=True)
 def cities_view(page: int = 1, country: str | None = None) -> list[AnyComponent]:
-    cities = cities_list()
-    page_size = 50
     filter_form_initial = {}
     if country:
-        cities = [city for city in cities if city.iso3 == country]
-        country_name = cities[0].country if cities else country
+        # filter lazily, only the cities up to the end of the requested page are checked,
+        # the rest are only counted if this isn't the last page
+        cities = paginate(
+            (city for city in cities_list() if city.iso3 == country),
+            page=page,
+            page_size=50,
+            total=lambda: sum(city.iso3 == country for city in cities_list()),
+        )
+        country_name = cities.rows[0].country if cities.rows else country
         filter_form_initial['country'] = {'value': country, 'label': country_name}
+    else:
+        cities = paginate(cities_list(), page=page, page_size=50)
     return demo_page(
         *tabs(),
         c.ModelForm(
@@ -66,8 +74,7 @@ def cities_view(page: int = 1, country: str | None = None) -> list[AnyComponent]
             submit_on_change=True,
             display_mode='inline',
         ),
-        c.Table(
-            data=cities[(page - 1) * page_size : page * page_size],
+        cities.table(
             data_model=City,
             columns=[
                 DisplayLookup(field='city', on_click=GoToEvent(url='./{id}'), table_width_percent=33),
@@ -75,7 +82,7 @@ def cities_view(page: int = 1, country: str | None = None) -> list[AnyComponent]
                 DisplayLookup(field='population', table_width_percent=33),
             ],
         ),
-        c.Pagination(page=page, page_size=page_size, total=len(cities)),
+        cities.pagination(),
         title='Cities',
     )
 
@@ -4,7 +4,7 @@ import type { ClassNameGenerator, CustomRender, models } from 'fastui'
 
 import { Modal } from './modal'
 import { Navbar } from './navbar'
-import { Pagination } from './pagination'
+import { Pagination, CursorPagination } from './pagination'
 import { Footer } from './footer'
 import { Toast } from './toast'
 
@@ -19,6 +19,8 @@ export const customRender: CustomRender = (props) => {
       return () => <Modal {...props} />
     case 'Pagination':
       return () => <Pagination {...props} />
+    case 'CursorPagination':
+      return () => <CursorPagination {...props} />
     case 'Toast':
       return () => <Toast {...props} />
   }
@@ -81,6 +83,7 @@ export const classNameGenerator: ClassNameGenerator = ({
     case 'FormFieldSelect':
     case 'FormFieldSelectSearch':
     case 'FormFieldFile':
+    case 'FormFieldUnion':
       switch (subElement) {
         case 'textarea':
         case 'input':
@@ -110,6 +113,22 @@ export const classNameGenerator: ClassNameGenerator = ({
             'form-switch': type === 'FormFieldBoolean' && props.mode === 'switch',
           }
       }
+    case 'FormFieldArray':
+      switch (subElement) {
+        case 'row':
+          return 'd-flex align-items-end gap-2'
+        case 'add':
+        case 'remove':
+          return 'btn btn-sm btn-outline-secondary mb-3'
+        case 'label':
+          return { 'form-label': true, 'fw-bold': !!props.required }
+        case 'error':
+          return 'invalid-feedback d-block'
+        case 'description':
+          return 'form-text'
+        default:
+          return 'mb-3'
+      }
     case 'Navbar':
       switch (subElement) {
         case 'contents':
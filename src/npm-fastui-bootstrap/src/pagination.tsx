@@ -1,4 +1,4 @@
-import { FC } from 'react'
+import { FC, ReactNode } from 'react'
 import { components, models, renderClassName } from 'fastui'
 
 interface Link {
@@ -11,7 +11,7 @@ interface Link {
 }
 
 export const Pagination: FC<models.Pagination> = (props) => {
-  const { page, pageCount, pageQueryParam } = props
+  const { page, pageCount, pageQueryParam, totalIsEstimate } = props
   if (pageCount === 1) return null
 
   const links: Link[] = [
@@ -35,8 +35,10 @@ export const Pagination: FC<models.Pagination> = (props) => {
     links.push({ Display: () => <>...</>, pageQueryParam })
   }
 
+  // the last page is linked to separately, unless the total is only an estimate
+  const lastPage = totalIsEstimate ? pageCount + 1 : pageCount
   for (let p = page - 2; p <= page + 2; p++) {
-    if (p <= 1 || p >= pageCount) continue
+    if (p <= 1 || p >= lastPage) continue
     links.push({
       Display: () => <>{p}</>,
       locked: page === p,
@@ -46,16 +48,23 @@ export const Pagination: FC<models.Pagination> = (props) => {
     })
   }
 
-  if (page < pageCount - 3) {
-    links.push({ Display: () => <>...</>, pageQueryParam })
-  }
+  if (totalIsEstimate) {
+    // the number of pages isn't known, so there's no link to the last page
+    if (page < pageCount) {
+      links.push({ Display: () => <>...</>, pageQueryParam })
+    }
+  } else {
+    if (page < pageCount - 3) {
+      links.push({ Display: () => <>...</>, pageQueryParam })
+    }
 
-  links.push({
-    Display: () => <>{pageCount}</>,
-    locked: page === pageCount,
-    page: pageCount,
-    pageQueryParam,
-  })
+    links.push({
+      Display: () => <>{pageCount}</>,
+      locked: page === pageCount,
+      page: pageCount,
+      pageQueryParam,
+    })
+  }
 
   links.push({
     Display: () => <span aria-hidden="true">&raquo;</span>,
@@ -99,3 +108,48 @@ const PaginationLink: FC<Link> = ({ Display, ariaLabel, locked, active, page, pa
     </li>
   )
 }
+
+export const CursorPagination: FC<models.CursorPagination> = (props) => {
+  const { nextCursor, prevCursor, hasMore } = props
+  const cursorQueryParam = props.cursorQueryParam ?? 'cursor'
+  const hasPrev = prevCursor !== undefined && prevCursor !== null
+  const hasNext = nextCursor !== undefined && nextCursor !== null && hasMore !== false
+  if (!hasPrev && !hasNext) return null
+
+  return (
+    <nav aria-label="Pagination">
+      <ul className="pagination justify-content-center">
+        <CursorPaginationLink
+          ariaLabel="Previous"
+          locked={!hasPrev}
+          // an empty cursor means the first page, so remove the cursor from the query
+          query={{ [cursorQueryParam]: prevCursor || null }}
+        >
+          <span aria-hidden="true">&laquo;</span>
+        </CursorPaginationLink>
+        <CursorPaginationLink ariaLabel="Next" locked={!hasNext} query={{ [cursorQueryParam]: nextCursor ?? null }}>
+          <span aria-hidden="true">&raquo;</span>
+        </CursorPaginationLink>
+      </ul>
+    </nav>
+  )
+}
+
+interface CursorPaginationLinkProps {
+  ariaLabel: string
+  locked: boolean
+  query: Record<string, string | null>
+  children: ReactNode
+}
+
+const CursorPaginationLink: FC<CursorPaginationLinkProps> = ({ ariaLabel, locked, query, children }) => {
+  const className = renderClassName({ 'page-link': true, disabled: locked } as models.ClassName)
+  const onClick: models.GoToEvent = { type: 'go-to', query }
+  return (
+    <li className="page-item">
+      <components.LinkRender onClick={onClick} className={className} locked={locked} ariaLabel={ariaLabel}>
+        {children}
+      </components.LinkRender>
+    </li>
+  )
+}
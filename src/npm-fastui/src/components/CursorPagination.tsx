@@ -0,0 +1,39 @@
+import { FC } from 'react'
+
+import type { CursorPagination, Link } from '../models'
+
+import { useClassName } from '../hooks/className'
+
+import { LinkListComp } from './LinkList'
+
+export const CursorPaginationComp: FC<CursorPagination> = (props) => {
+  const { nextCursor, prevCursor, hasMore } = props
+  const cursorQueryParam = props.cursorQueryParam ?? 'cursor'
+  const className = useClassName(props)
+
+  const hasPrev = prevCursor !== undefined && prevCursor !== null
+  const hasNext = nextCursor !== undefined && nextCursor !== null && hasMore !== false
+  if (!hasPrev && !hasNext) return null
+
+  const links: Link[] = [
+    {
+      type: 'Link',
+      components: [{ type: 'Text', text: 'Previous' }],
+      locked: !hasPrev,
+      // an empty cursor means the first page, so remove the cursor from the query
+      onClick: { type: 'go-to', query: { [cursorQueryParam]: prevCursor || null } },
+    },
+    {
+      type: 'Link',
+      components: [{ type: 'Text', text: 'Next' }],
+      locked: !hasNext,
+      onClick: { type: 'go-to', query: { [cursorQueryParam]: nextCursor ?? null } },
+    },
+  ]
+
+  return (
+    <div className={className}>
+      <LinkListComp type="LinkList" links={links} mode="pagination" />
+    </div>
+  )
+}
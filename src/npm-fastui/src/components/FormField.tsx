@@ -1,4 +1,4 @@
-import { FC, useState } from 'react'
+import { FC, useEffect, useRef, useState } from 'react'
 import AsyncSelect from 'react-select/async'
 import Select, { StylesConfig } from 'react-select'
 
@@ -9,6 +9,9 @@ import type {
   FormFieldFile,
   FormFieldSelect,
   FormFieldSelectSearch,
+  FormFieldArray,
+  FormFieldUnion,
+  JsonData,
   SelectOption,
   SelectOptions,
   SelectGroup,
@@ -17,6 +20,8 @@ import type {
 import { useClassName } from '../hooks/className'
 import { debounce, useRequest } from '../tools'
 
+import { AnyCompList } from './index'
+
 type PrivateOnChange = () => void
 
 interface FormFieldInputProps extends FormFieldInput {
@@ -309,6 +314,158 @@ export const FormFieldSelectSearchComp: FC<FormFieldSelectSearchProps> = (props)
   )
 }
 
+// arrays and unions render their own fields, so they're passed errors and initial values for the whole form
+interface ParentFieldProps {
+  onChange?: PrivateOnChange
+  formErrors?: Record<string, string>
+  formInitial?: Record<string, JsonData>
+}
+
+function childFieldProps(
+  field: FormFieldProps,
+  name: string,
+  parent: ParentFieldProps & { locked?: boolean; displayMode?: 'default' | 'inline' },
+): FormFieldProps {
+  const { formErrors, formInitial, locked, displayMode, onChange } = parent
+  const f = { ...field, name, error: formErrors && formErrors[name], locked, displayMode, onChange } as FormFieldProps
+  const initial = formInitial && formInitial[name]
+  if (initial !== undefined) {
+    ;(f as any).initial = initial
+  }
+  if (f.type === 'FormFieldArray' || f.type === 'FormFieldUnion') {
+    f.formErrors = formErrors
+    f.formInitial = formInitial
+  }
+  return f
+}
+
+interface FormFieldArrayProps extends FormFieldArray, ParentFieldProps {}
+
+export const FormFieldArrayComp: FC<FormFieldArrayProps> = (props) => {
+  const { itemFields, minItems, maxItems, locked, onChange, formInitial } = props
+
+  // rows are keyed by a stable id so inputs keep their values when an earlier row is removed,
+  // names use the row's current position so the submitted indexes have no gaps
+  const nextId = useRef(0)
+  const [rows, setRows] = useState<number[]>(() => {
+    let count = minItems ?? 0
+    while (formInitial && itemFields.some((f) => formInitial[itemName(f.name, count)] !== undefined)) {
+      count++
+    }
+    nextId.current = count
+    return Array.from({ length: count }, (_, i) => i)
+  })
+
+  const addRow = () => setRows((rows) => [...rows, nextId.current++])
+  const removeRow = (id: number) => {
+    setRows((rows) => rows.filter((r) => r !== id))
+    onChange && onChange()
+  }
+
+  const rowClassName = useClassName(props, { el: 'row' })
+  const removeClassName = useClassName(props, { el: 'remove' })
+  const addClassName = useClassName(props, { el: 'add' })
+  return (
+    <div className={useClassName(props)}>
+      <Label {...props} />
+      {rows.map((id, index) => (
+        <div key={id} className={rowClassName}>
+          <AnyCompList propsList={itemFields.map((field) => rowFieldProps(field, index, props))} />
+          <button
+            type="button"
+            className={removeClassName}
+            disabled={locked || rows.length <= (minItems ?? 0)}
+            onClick={() => removeRow(id)}
+          >
+            Remove
+          </button>
+        </div>
+      ))}
+      <button
+        type="button"
+        className={addClassName}
+        disabled={locked || (maxItems !== undefined && rows.length >= maxItems)}
+        onClick={addRow}
+      >
+        Add
+      </button>
+      <ErrorDescription {...props} />
+    </div>
+  )
+}
+
+const itemName = (name: string, index: number) => name.replace(/{index}/g, index.toString())
+
+function rowFieldProps(field: FormFieldProps, index: number, parent: FormFieldArrayProps): FormFieldProps {
+  const f = childFieldProps(field, itemName(field.name, index), parent)
+  if (f.type === 'FormFieldUnion' && f.variantFields) {
+    // the fields of each variant are also in the row, so their names need the index too
+    const variantFields: Record<string, FormFieldProps[]> = {}
+    for (const [variant, fields] of Object.entries(f.variantFields)) {
+      variantFields[variant] = fields.map((v) => ({ ...v, name: itemName(v.name, index) }) as FormFieldProps)
+    }
+    f.variantFields = variantFields
+  }
+  return f
+}
+
+interface FormFieldUnionProps extends FormFieldUnion, ParentFieldProps {}
+
+export const FormFieldUnionComp: FC<FormFieldUnionProps> = (props) => {
+  const { name, required, locked, options, initial, variantsUrl, variantFields, onChange } = props
+  const [variant, setVariant] = useState<string>(initial ?? '')
+  const [fields, setFields] = useState<FormFieldProps[]>([])
+  // fields loaded from `variantsUrl`, so switching back to a variant doesn't load it again, keyed by name too
+  // since the name changes when the union is in an array row and an earlier row is removed
+  const loaded = useRef<Record<string, FormFieldProps[]>>({})
+  const request = useRequest()
+
+  useEffect(() => {
+    if (!variant) {
+      setFields([])
+    } else if (variantFields) {
+      setFields(variantFields[variant] ?? [])
+    } else if (`${name}:${variant}` in loaded.current) {
+      setFields(loaded.current[`${name}:${variant}`])
+    } else if (variantsUrl) {
+      let current = true
+      request({ url: variantsUrl, query: { name, variant } }).then(([, data]) => {
+        loaded.current[`${name}:${variant}`] = data as FormFieldProps[]
+        current && setFields(data as FormFieldProps[])
+      })
+      return () => {
+        current = false
+      }
+    }
+  }, [variant, variantFields, variantsUrl, name, request])
+
+  return (
+    <div className={useClassName(props)}>
+      <Label {...props} />
+      <select
+        id={inputId(props)}
+        className={useClassName(props, { el: 'select' })}
+        value={variant}
+        name={name}
+        required={required}
+        disabled={locked}
+        aria-describedby={descId(props)}
+        onChange={(e) => {
+          setVariant(e.target.value)
+          onChange && onChange()
+        }}
+      >
+        <option></option>
+        {options.map((option, i) => (
+          <SelectOptionComp key={i} option={option} />
+        ))}
+      </select>
+      <ErrorDescription {...props} />
+      <AnyCompList propsList={fields.map((field) => childFieldProps(field, field.name, props))} />
+    </div>
+  )
+}
+
 const Label: FC<FormFieldProps> = (props) => {
   let { title } = props
   if (!Array.isArray(title)) {
@@ -332,6 +489,8 @@ export type FormFieldProps =
   | FormFieldFileProps
   | FormFieldSelectProps
   | FormFieldSelectSearchProps
+  | FormFieldArrayProps
+  | FormFieldUnionProps
 
 const inputId = (props: FormFieldProps) => `form-field-${props.name}`
 const descId = (props: FormFieldProps) => (props.description ? `${inputId(props)}-desc` : undefined)
@@ -9,6 +9,7 @@ import { ConfigContext } from '../hooks/config'
 import { usePageEventListen } from '../events'
 import { EventContextProvider, useEventContext } from '../hooks/eventContext'
 import { LocationContext } from '../hooks/locationContext'
+import { applyPatch, isPatchMessage } from '../patch'
 
 import { AnyCompList } from './index'
 
@@ -123,7 +124,13 @@ export const ServerLoadSSE: FC<SSEProps> = ({ path, method, sseRetry }) => {
   const [componentProps, setComponentProps] = useState<FastProps[] | null>(null)
 
   const url = useServerUrl(path)
-  const onMessage = useCallback((data: any) => setComponentProps(data as FastProps[]), [])
+  const onMessage = useCallback((data: any) => {
+    if (isPatchMessage(data)) {
+      setComponentProps((prev) => (prev === null ? prev : applyPatch(prev, data.patch)))
+    } else {
+      setComponentProps(data as FastProps[])
+    }
+  }, [])
   useSSE(url, onMessage, method, sseRetry)
 
   return <Render propsList={componentProps} transitioning={false} />
@@ -115,6 +115,10 @@ export const FormComp: FC<Form | ModelForm> = (props) => {
     if (formInitial !== undefined) {
       ;(f as any).initial = formInitial
     }
+    if (f.type === 'FormFieldArray' || f.type === 'FormFieldUnion') {
+      f.formErrors = fieldErrors
+      f.formInitial = initial
+    }
     return f
   })
 
@@ -21,6 +21,8 @@ import {
   FormFieldSelectComp,
   FormFieldSelectSearchComp,
   FormFieldFileComp,
+  FormFieldArrayComp,
+  FormFieldUnionComp,
 } from './FormField'
 import { ButtonComp } from './button'
 import { LinkComp, LinkRender } from './link'
@@ -29,6 +31,7 @@ import { NavbarComp } from './navbar'
 import { ModalComp } from './modal'
 import { TableComp } from './table'
 import { PaginationComp } from './pagination'
+import { CursorPaginationComp } from './CursorPagination'
 import { DetailsComp } from './details'
 import { DisplayComp } from './display'
 import { JsonComp } from './Json'
@@ -58,6 +61,8 @@ export {
   FormFieldSelectComp,
   FormFieldSelectSearchComp,
   FormFieldFileComp,
+  FormFieldArrayComp,
+  FormFieldUnionComp,
   ButtonComp,
   LinkComp,
   LinkListComp,
@@ -65,6 +70,7 @@ export {
   ModalComp,
   TableComp,
   PaginationComp,
+  CursorPaginationComp,
   DetailsComp,
   DisplayComp,
   JsonComp,
@@ -140,12 +146,18 @@ export const AnyComp: FC<FastProps> = (props) => {
         return <FormFieldSelectComp {...props} />
       case 'FormFieldSelectSearch':
         return <FormFieldSelectSearchComp {...props} />
+      case 'FormFieldArray':
+        return <FormFieldArrayComp {...props} />
+      case 'FormFieldUnion':
+        return <FormFieldUnionComp {...props} />
       case 'Modal':
         return <ModalComp {...props} />
       case 'Table':
         return <TableComp {...props} />
       case 'Pagination':
         return <PaginationComp {...props} />
+      case 'CursorPagination':
+        return <CursorPaginationComp {...props} />
       case 'Details':
         return <DetailsComp {...props} />
       case 'Display':
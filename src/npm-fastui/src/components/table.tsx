@@ -1,6 +1,6 @@
-import { FC, CSSProperties } from 'react'
+import { FC, CSSProperties, useMemo } from 'react'
 
-import type { Table } from '../models'
+import type { Table, JsonData } from '../models'
 
 import { asTitle } from '../tools'
 import { useClassName } from '../hooks/className'
@@ -8,8 +8,12 @@ import { useClassName } from '../hooks/className'
 import { DisplayComp, DisplayLookupProps, DataModel, renderEvent } from './display'
 
 export const TableComp: FC<Table> = (props) => {
-  const { columns, data, noDataMessage } = props
+  const { columns, data, columnar, noDataMessage } = props
   const noDataClassName = useClassName(props, { el: 'no-data-message' })
+  const rows = useMemo(
+    () => (columnar ? columnsToRows(data as ColumnarData) : (data as DataModel[])),
+    [data, columnar],
+  )
 
   return (
     <table className={useClassName(props)}>
@@ -23,7 +27,7 @@ export const TableComp: FC<Table> = (props) => {
         </tr>
       </thead>
       <tbody>
-        {data.map((row, rowId) => (
+        {rows.map((row, rowId) => (
           <tr key={rowId}>
             {columns.map((column, id) => (
               <Cell key={id} row={row} column={column} />
@@ -31,11 +35,28 @@ export const TableComp: FC<Table> = (props) => {
           </tr>
         ))}
       </tbody>
-      {data.length === 0 && <caption className={noDataClassName}>{noDataMessage || 'No data'}</caption>}
+      {rows.length === 0 && <caption className={noDataClassName}>{noDataMessage || 'No data'}</caption>}
     </table>
   )
 }
 
+type ColumnarData = { [k: string]: JsonData[] }
+
+// with `columnar: true` data is sent as one array per field, convert it back into rows
+function columnsToRows(data: ColumnarData): DataModel[] {
+  const columns = Object.entries(data)
+  const rowCount = columns[0]?.[1].length ?? 0
+  const rows: DataModel[] = []
+  for (let rowId = 0; rowId < rowCount; rowId++) {
+    const row: DataModel = {}
+    for (const [field, values] of columns) {
+      row[field] = values[rowId] ?? null
+    }
+    rows.push(row)
+  }
+  return rows
+}
+
 const colWidth = (w: number | undefined): CSSProperties | undefined => (w ? { width: `${w}%` } : undefined)
 
 const Cell: FC<{ row: DataModel; column: DisplayLookupProps }> = ({ row, column }) => {
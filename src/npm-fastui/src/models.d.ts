@@ -30,6 +30,7 @@ export type FastProps =
   | Custom
   | Table
   | Pagination
+  | CursorPagination
   | Display
   | Details
   | Form
@@ -39,6 +40,8 @@ export type FastProps =
   | FormFieldFile
   | FormFieldSelect
   | FormFieldSelectSearch
+  | FormFieldArray
+  | FormFieldUnion
   | ModelForm
   | Toast
 export type ClassName =
@@ -470,9 +473,14 @@ export interface Custom {
  * Table component.
  */
 export interface Table {
-  data: DataModel[]
+  data:
+    | DataModel[]
+    | {
+        [k: string]: JsonData[]
+      }
   columns: DisplayLookup[]
   noDataMessage?: string
+  columnar?: boolean
   className?:
     | string
     | ClassName[]
@@ -501,6 +509,7 @@ export interface Pagination {
   page: number
   pageSize: number
   total: number
+  totalIsEstimate?: boolean
   pageQueryParam?: string
   className?:
     | string
@@ -511,6 +520,22 @@ export interface Pagination {
   type: 'Pagination'
   pageCount: number
 }
+/**
+ * Cursor (keyset) based pagination component to use with tables, where the total number of items isn't known.
+ */
+export interface CursorPagination {
+  nextCursor?: string
+  prevCursor?: string
+  hasMore?: boolean
+  cursorQueryParam?: string
+  className?:
+    | string
+    | ClassName[]
+    | {
+        [k: string]: boolean
+      }
+  type: 'CursorPagination'
+}
 /**
  * Description of how to display a value, either in a table or detail view.
  */
@@ -562,6 +587,8 @@ export interface Form {
     | FormFieldFile
     | FormFieldSelect
     | FormFieldSelectSearch
+    | FormFieldArray
+    | FormFieldUnion
   )[]
   type: 'Form'
 }
@@ -723,6 +750,71 @@ export interface SelectOption1 {
   value: string
   label: string
 }
+/**
+ * Form field for a variable number of rows, each row is rendered in the browser from a template of fields.
+ */
+export interface FormFieldArray {
+  name: string
+  title: string[] | string
+  required?: boolean
+  error?: string
+  locked?: boolean
+  description?: string
+  displayMode?: 'default' | 'inline'
+  className?:
+    | string
+    | ClassName[]
+    | {
+        [k: string]: boolean
+      }
+  itemFields: (
+    | FormFieldInput
+    | FormFieldTextarea
+    | FormFieldBoolean
+    | FormFieldFile
+    | FormFieldSelect
+    | FormFieldSelectSearch
+    | FormFieldArray
+    | FormFieldUnion
+  )[]
+  minItems?: number
+  maxItems?: number
+  type: 'FormFieldArray'
+}
+/**
+ * Form field for a discriminated union, a variant is selected then the fields of that variant are displayed.
+ */
+export interface FormFieldUnion {
+  name: string
+  title: string[] | string
+  required?: boolean
+  error?: string
+  locked?: boolean
+  description?: string
+  displayMode?: 'default' | 'inline'
+  className?:
+    | string
+    | ClassName[]
+    | {
+        [k: string]: boolean
+      }
+  options: SelectOptions
+  initial?: string
+  variantsUrl?: string
+  variantFields?: {
+    [k: string]: (
+      | FormFieldInput
+      | FormFieldTextarea
+      | FormFieldBoolean
+      | FormFieldFile
+      | FormFieldSelect
+      | FormFieldSelectSearch
+      | FormFieldArray
+      | FormFieldUnion
+    )[]
+  }
+  type: 'FormFieldUnion'
+}
 /**
  * Form component generated from a Pydantic model.
  */
@@ -751,6 +843,8 @@ export interface ModelForm {
     | FormFieldFile
     | FormFieldSelect
     | FormFieldSelectSearch
+    | FormFieldArray
+    | FormFieldUnion
   )[]
 }
 export interface PageEvent4 {
@@ -0,0 +1,53 @@
+import type { FastProps } from './models'
+
+type PathItem = string | number
+
+export interface PatchOp {
+  op: 'append' | 'replace' | 'remove'
+  path: PathItem[]
+  value?: any
+}
+
+export interface PatchMessage {
+  patch: PatchOp[]
+}
+
+export function isPatchMessage(data: any): data is PatchMessage {
+  return typeof data === 'object' && data !== null && Array.isArray(data.patch)
+}
+
+/**
+ * Apply patch operations sent by the server to a list of components.
+ *
+ * Containers along each path are copied rather than mutated so memoized components re-render.
+ */
+export function applyPatch(propsList: FastProps[], ops: PatchOp[]): FastProps[] {
+  return ops.reduce((root: any, op) => applyOp(root, op.path, op), propsList)
+}
+
+function applyOp(target: any, path: PathItem[], op: PatchOp): any {
+  const [key, ...rest] = path
+  if (key === undefined) {
+    switch (op.op) {
+      case 'append':
+        // works for both lists and strings
+        return target === undefined ? op.value : target.concat(op.value)
+      case 'replace':
+        return op.value
+      default:
+        console.warn('unknown patch operation', op)
+        return target
+    }
+  }
+  if (target === null || typeof target !== 'object') {
+    console.warn('invalid patch path', op.path)
+    return target
+  }
+  const copy = Array.isArray(target) ? [...target] : { ...target }
+  if (op.op === 'remove' && rest.length === 0) {
+    delete copy[key]
+  } else {
+    copy[key] = applyOp(target[key], rest, op)
+  }
+  return copy
+}
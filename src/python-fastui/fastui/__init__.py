@@ -1,8 +1,9 @@
 import typing as _t
 
 import pydantic
+from pydantic_core import core_schema as _core_schema
 
-from .components import AnyComponent
+from .components import AnyComponent, _validate_components
 
 __version__ = '0.8.0'
 __all__ = 'AnyComponent', 'FastUI', 'prebuilt_html'
@@ -15,12 +16,12 @@ class FastUI(pydantic.RootModel):
 
     root: list[AnyComponent]
 
-    @pydantic.field_validator('root', mode='before')
-    def coerce_to_list(cls, v):
-        if isinstance(v, list):
-            return v
-        else:
-            return [v]
+    @pydantic.field_validator('root', mode='wrap')
+    def coerce_to_list(cls, v: _t.Any, handler: _core_schema.ValidatorFunctionWrapHandler) -> _t.Any:
+        if not isinstance(v, list):
+            v = [v]
+        # components constructed in Python code are not re-validated
+        return _validate_components(v, handler)
 
 
 _PREBUILT_VERSION = '0.0.25'
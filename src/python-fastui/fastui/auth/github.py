@@ -1,8 +1,19 @@
-from collections.abc import AsyncIterator
+import asyncio
+import base64
+import hashlib
+import hmac
+import json
+import os
+import secrets
+import tempfile
+import time
+from collections import OrderedDict
+from collections.abc import AsyncIterator, Awaitable, Callable
 from contextlib import asynccontextmanager
-from dataclasses import dataclass
+from dataclasses import asdict, dataclass
 from datetime import datetime, timedelta, timezone
-from typing import TYPE_CHECKING, Union, cast
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Protocol, TypeVar, Union, cast
 from urllib.parse import urlencode
 
 from pydantic import BaseModel, SecretStr, TypeAdapter, field_validator
@@ -11,9 +22,28 @@ from .shared import AuthError
 
 if TYPE_CHECKING:
     import httpx
+    import jwt
+else:
+    try:
+        import jwt
+    except ImportError:  # pragma: no cover
+        # PyJWT is optional, `StateProvider` raises an error if it's used without it
+        jwt = None
+
 
+__all__ = (
+    'GitHubAuthProvider',
+    'GitHubExchange',
+    'GithubUser',
+    'GitHubEmail',
+    'ExchangeCacheBackend',
+    'ExchangeCache',
+    'FileExchangeCache',
+    'StateProvider',
+    'HMACStateProvider',
+)
 
-__all__ = 'GitHubAuthProvider', 'GitHubExchange', 'GithubUser', 'GitHubEmail'
+T = TypeVar('T')
 
 
 @dataclass
@@ -78,8 +108,10 @@ class GitHubAuthProvider:
         *,
         redirect_uri: Union[str, None] = None,
         scopes: Union[list[str], None] = None,
-        state_provider: Union['StateProvider', bool] = True,
+        state_provider: Union['StateProvider', 'HMACStateProvider', bool] = True,
         exchange_cache_age: Union[timedelta, None] = timedelta(seconds=30),
+        exchange_cache: Union['ExchangeCacheBackend', None] = None,
+        profile_cache_age: Union[timedelta, None] = None,
     ):
         """
         Arguments:
@@ -89,9 +121,14 @@ class GitHubAuthProvider:
             redirect_uri: The URL in your app where users will be sent after authorization, if custom
             scopes: See https://docs.github.com/en/apps/oauth-apps/building-oauth-apps/scopes-for-oauth-apps#available-scopes
             state_provider: If `True`, use a `StateProvider` to generate and validate state parameters for the OAuth
-                flow, you can also provide an instance directly.
+                flow, you can also provide an instance directly, e.g. of the faster `HMACStateProvider`.
             exchange_cache_age: If not `None`,
                 responses from the access token exchange are cached for the given duration.
+            exchange_cache: Where to cache exchange responses, defaults to `EXCHANGE_CACHE` which is shared by all
+                providers in the process, use `FileExchangeCache` or your own `ExchangeCacheBackend` to share
+                the cache between worker processes.
+            profile_cache_age: If not `None`, user and email responses are cached for the given duration, then
+                revalidated with their ETag, so unchanged profiles don't count against GitHub's rate limit.
         """
         self._httpx_client = httpx_client
         self._github_client_id = github_client_id
@@ -106,6 +143,8 @@ class GitHubAuthProvider:
             self._state_provider = state_provider
         # cache exchange responses, see `exchange_code` for details
         self._exchange_cache_age = exchange_cache_age
+        self._exchange_cache = EXCHANGE_CACHE if exchange_cache is None else exchange_cache
+        self._profile_cache_age = profile_cache_age
 
     @classmethod
     @asynccontextmanager
@@ -115,8 +154,10 @@ class GitHubAuthProvider:
         client_secret: SecretStr,
         *,
         redirect_uri: Union[str, None] = None,
-        state_provider: Union['StateProvider', bool] = True,
+        state_provider: Union['StateProvider', 'HMACStateProvider', bool] = True,
         exchange_cache_age: Union[timedelta, None] = timedelta(seconds=10),
+        exchange_cache: Union['ExchangeCacheBackend', None] = None,
+        profile_cache_age: Union[timedelta, None] = None,
     ) -> AsyncIterator['GitHubAuthProvider']:
         """
         Async context manager to create a GitHubAuth instance with a new `httpx.AsyncClient`.
@@ -131,6 +172,8 @@ class GitHubAuthProvider:
                 redirect_uri=redirect_uri,
                 state_provider=state_provider,
                 exchange_cache_age=exchange_cache_age,
+                exchange_cache=exchange_cache,
+                profile_cache_age=profile_cache_age,
             )
 
     async def authorization_url(self) -> str:
@@ -152,17 +195,20 @@ class GitHubAuthProvider:
 
         If `self._exchange_cache_age` is not `None` (the default), responses are cached for the given duration to
         work around issues with React often sending the same request multiple times in development mode.
+
+        Concurrent calls with the same code and state share a single request to GitHub.
         """
+        cache_key = f'{code}:{state}'
         if self._exchange_cache_age:
-            cache_key = f'{code}:{state}'
-            if exchange := EXCHANGE_CACHE.get(cache_key, self._exchange_cache_age):
+            if exchange := await self._exchange_cache.get(cache_key):
                 return exchange
-            else:
-                exchange = await self._exchange_code(code, state)
-                EXCHANGE_CACHE.set(cache_key, exchange)
-                return exchange
-        else:
-            return await self._exchange_code(code, state)
+        return await IN_FLIGHT.run(f'exchange:{cache_key}', lambda: self._exchange_code_cached(cache_key, code, state))
+
+    async def _exchange_code_cached(self, cache_key: str, code: str, state: Union[str, None]) -> GitHubExchange:
+        exchange = await self._exchange_code(code, state)
+        if self._exchange_cache_age:
+            await self._exchange_cache.set(cache_key, exchange, self._exchange_cache_age)
+        return exchange
 
     async def _exchange_code(self, code: str, state: Union[str, None] = None) -> GitHubExchange:
         if self._state_provider:
@@ -197,20 +243,59 @@ class GitHubAuthProvider:
     async def get_github_user(self, exchange: GitHubExchange) -> GithubUser:
         """
         See https://docs.github.com/en/rest/users/users#get-the-authenticated-user
+
+        Concurrent calls with the same access token share a single request to GitHub.
         """
-        headers = self._auth_headers(exchange)
-        user_response = await self._httpx_client.get('https://api.github.com/user', headers=headers)
-        user_response.raise_for_status()
-        return GithubUser.model_validate_json(user_response.content)
+        return await IN_FLIGHT.run(f'user:{exchange.access_token}', lambda: self._get_github_user(exchange))
+
+    async def _get_github_user(self, exchange: GitHubExchange) -> GithubUser:
+        return await self._github_get('https://api.github.com/user', exchange, GithubUser.model_validate_json)
 
     async def get_github_user_emails(self, exchange: GitHubExchange) -> list[GitHubEmail]:
         """
         See https://docs.github.com/en/rest/users/emails
+
+        Concurrent calls with the same access token share a single request to GitHub.
         """
+        emails = await IN_FLIGHT.run(f'emails:{exchange.access_token}', lambda: self._get_github_user_emails(exchange))
+        # copy so callers sharing a request can't modify each other's list
+        return list(emails)
+
+    async def _get_github_user_emails(self, exchange: GitHubExchange) -> list[GitHubEmail]:
+        return await self._github_get('https://api.github.com/user/emails', exchange, github_emails_ta.validate_json)
+
+    async def get_github_identity(self, exchange: GitHubExchange) -> tuple[GithubUser, list[GitHubEmail]]:
+        """
+        Get the authenticated user and their emails, the two requests are made concurrently.
+        """
+        user, emails = await asyncio.gather(self.get_github_user(exchange), self.get_github_user_emails(exchange))
+        return user, emails
+
+    async def _github_get(self, url: str, exchange: GitHubExchange, parse: Callable[[bytes], T]) -> T:
         headers = self._auth_headers(exchange)
-        emails_response = await self._httpx_client.get('https://api.github.com/user/emails', headers=headers)
-        emails_response.raise_for_status()
-        return github_emails_ta.validate_json(emails_response.content)
+        if not self._profile_cache_age:
+            r = await self._httpx_client.get(url, headers=headers)
+            r.raise_for_status()
+            return parse(r.content)
+
+        cache_key = f'{url}:{exchange.access_token}'
+        entry = PROFILE_CACHE.get(cache_key)
+        if entry is not None:
+            expiry, etag, value = entry
+            if expiry > time.monotonic():
+                return value
+            elif etag:
+                headers['If-None-Match'] = etag
+
+        r = await self._httpx_client.get(url, headers=headers)
+        if r.status_code == 304 and entry is not None:
+            # not modified, keep the cached value
+            _, etag, value = entry
+        else:
+            r.raise_for_status()
+            etag, value = r.headers.get('etag'), parse(r.content)
+        PROFILE_CACHE.set(cache_key, (time.monotonic() + self._profile_cache_age.total_seconds(), etag, value))
+        return value
 
     @staticmethod
     def _auth_headers(exchange: GitHubExchange) -> dict[str, str]:
@@ -220,26 +305,56 @@ class GitHubAuthProvider:
         }
 
 
+class ExchangeCacheBackend(Protocol):
+    """
+    Storage for access token exchange responses, implement this to cache exchanges in an external store.
+    """
+
+    async def get(self, key: str) -> Union[GitHubExchange, None]:
+        """
+        Get an exchange which hasn't expired, or `None`.
+        """
+        ...
+
+    async def set(self, key: str, value: GitHubExchange, max_age: timedelta) -> None:
+        """
+        Store an exchange, it should expire after `max_age`.
+        """
+        ...
+
+
 class ExchangeCache:
-    def __init__(self):
-        self._data: dict[str, tuple[datetime, GitHubExchange]] = {}
+    """
+    In process exchange cache, entries are kept in insertion order, so expired entries are removed from the front
+    without scanning the whole cache, the oldest entries are also removed if the cache exceeds `max_size`.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self._max_size = max_size
+        # values are (expiry as returned by time.monotonic(), exchange)
+        self._data: OrderedDict[str, tuple[float, GitHubExchange]] = OrderedDict()
 
-    def get(self, key: str, max_age: timedelta) -> Union[GitHubExchange, None]:
-        self._purge(max_age)
-        if v := self._data.get(key):
+    async def get(self, key: str) -> Union[GitHubExchange, None]:
+        now = time.monotonic()
+        self._purge(now)
+        if (v := self._data.get(key)) and v[0] > now:
             return v[1]
 
-    def set(self, key: str, value: GitHubExchange) -> None:
-        self._data[key] = (datetime.now(), value)
+    async def set(self, key: str, value: GitHubExchange, max_age: timedelta) -> None:
+        self._data[key] = (time.monotonic() + max_age.total_seconds(), value)
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_size:
+            self._data.popitem(last=False)
 
-    def _purge(self, max_age: timedelta) -> None:
+    def _purge(self, now: float) -> None:
         """
-        Remove old items from the exchange cache
+        Remove expired items from the front of the exchange cache
         """
-        min_timestamp = datetime.now() - max_age
-        to_remove = [k for k, (ts, _) in self._data.items() if ts < min_timestamp]
-        for k in to_remove:
-            del self._data[k]
+        while self._data:
+            expiry, _ = next(iter(self._data.values()))
+            if expiry > now:
+                break
+            self._data.popitem(last=False)
 
     def __len__(self) -> int:
         return len(self._data)
@@ -248,10 +363,152 @@ class ExchangeCache:
         self._data.clear()
 
 
+class FileExchangeCache:
+    """
+    Exchange cache stored as files in a directory, so it can be shared by multiple worker processes on one machine,
+    use a directory in `/dev/shm` to keep it in memory.
+
+    Each file's modification time is set to its expiry time, so expired files can be removed without reading them.
+    Expired files are removed at most every `purge_interval`, when the cache is read or written.
+
+    Files contain GitHub access tokens in plain text, and tokens don't expire by default, so anyone who can read the
+    directory can act as the users whose tokens it holds. The directory is created readable only by its owner, and
+    files are created the same way, but expired files are only removed while the cache is in use, so tokens may be
+    left in the directory after the application stops. Use a directory only this application can access, and
+    prefer a `tmpfs` like `/dev/shm` so the files don't outlive a reboot.
+    """
+
+    def __init__(self, directory: Union[str, Path], *, purge_interval: timedelta = timedelta(minutes=1)):
+        self._directory = Path(directory)
+        self._directory.mkdir(mode=0o700, parents=True, exist_ok=True)
+        self._purge_interval = purge_interval.total_seconds()
+        self._next_purge = 0.0
+
+    async def get(self, key: str) -> Union[GitHubExchange, None]:
+        return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: GitHubExchange, max_age: timedelta) -> None:
+        await asyncio.to_thread(self._set, key, value, max_age)
+
+    def _get(self, key: str) -> Union[GitHubExchange, None]:
+        now = time.time()
+        self._maybe_purge(now)
+        path = self._path(key)
+        try:
+            if path.stat().st_mtime <= now:
+                path.unlink(missing_ok=True)
+                return None
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+        return GitHubExchange(**json.loads(data))
+
+    def _set(self, key: str, value: GitHubExchange, max_age: timedelta) -> None:
+        now = time.time()
+        # write to a temporary file then rename, so other processes never read a partial file
+        fd, tmp_path = tempfile.mkstemp(dir=self._directory, prefix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(asdict(value), f)
+        expiry = now + max_age.total_seconds()
+        os.utime(tmp_path, (expiry, expiry))
+        os.replace(tmp_path, self._path(key))
+        self._maybe_purge(now)
+
+    def _maybe_purge(self, now: float) -> None:
+        if now >= self._next_purge:
+            self._next_purge = now + self._purge_interval
+            self._purge(now)
+
+    def _purge(self, now: float) -> None:
+        for path in self._directory.iterdir():
+            try:
+                if path.stat().st_mtime <= now and not path.name.startswith('.tmp'):
+                    path.unlink(missing_ok=True)
+            except FileNotFoundError:
+                pass
+
+    def _path(self, key: str) -> Path:
+        return self._directory / hashlib.sha256(key.encode()).hexdigest()
+
+
 # exchange cache is a singleton so instantiating a new GitHubAuthProvider reuse the same cache
 EXCHANGE_CACHE = ExchangeCache()
 
 
+class SingleFlight:
+    """
+    Coalesce concurrent calls with the same key, the call runs in its own task which every caller awaits.
+
+    Cancelling a caller, including the one which started the call, doesn't affect the others, the call is only
+    cancelled once no callers are waiting for it.
+    """
+
+    def __init__(self):
+        self._in_flight: dict[str, asyncio.Future[Any]] = {}
+        self._waiters: dict[asyncio.Future[Any], int] = {}
+
+    async def run(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        task = self._in_flight.get(key)
+        if task is None:
+            task = self._in_flight[key] = asyncio.ensure_future(func())
+            task.add_done_callback(lambda t: self._done(key, t))
+        self._waiters[task] = self._waiters.get(task, 0) + 1
+        try:
+            return await asyncio.shield(task)
+        finally:
+            self._waiters[task] -= 1
+            if not self._waiters[task]:
+                del self._waiters[task]
+                # no one is waiting for the result, so stop the call if it's still running
+                self._done(key, task)
+                task.cancel()
+
+    def _done(self, key: str, task: asyncio.Future[Any]) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if task.done() and not task.cancelled():
+            # mark the exception as retrieved, so it's not logged if every caller was cancelled
+            task.exception()
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+
+# in flight calls are shared by all GitHubAuthProvider instances, like EXCHANGE_CACHE
+IN_FLIGHT = SingleFlight()
+
+
+class ProfileCache:
+    """
+    In process LRU cache of GitHub user and email responses, see `GitHubAuthProvider.profile_cache_age`.
+    """
+
+    def __init__(self, max_size: int = 1024):
+        self._max_size = max_size
+        # values are (expiry as returned by time.monotonic(), ETag, parsed response)
+        self._data: OrderedDict[str, tuple[float, Union[str, None], Any]] = OrderedDict()
+
+    def get(self, key: str) -> Union[tuple[float, Union[str, None], Any], None]:
+        if (entry := self._data.get(key)) is not None:
+            self._data.move_to_end(key)
+        return entry
+
+    def set(self, key: str, entry: tuple[float, Union[str, None], Any]) -> None:
+        self._data[key] = entry
+        self._data.move_to_end(key)
+        while len(self._data) > self._max_size:
+            self._data.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+
+PROFILE_CACHE = ProfileCache()
+
+
 class StateProvider:
     """
     This is a simple state provider for the GitHub OAuth flow which uses a JWT to create an unguessable "state" string.
@@ -260,21 +517,82 @@ class StateProvider:
     """
 
     def __init__(self, secret: SecretStr, max_age: timedelta = timedelta(minutes=5)):
+        if jwt is None:
+            raise ImportError('`StateProvider` requires PyJWT, install it or use `HMACStateProvider` instead')
         self._secret = secret
         self._max_age = max_age
 
     async def new_state(self) -> str:
-        import jwt
-
         data = {'exp': datetime.now(tz=timezone.utc) + self._max_age}
         return jwt.encode(data, self._secret.get_secret_value(), algorithm='HS256')
 
     async def check_state(self, state: str) -> bool:
-        import jwt
-
         try:
             jwt.decode(state, self._secret.get_secret_value(), algorithms=['HS256'])
         except (jwt.DecodeError, jwt.ExpiredSignatureError):
             return False
         else:
             return True
+
+
+class HMACStateProvider:
+    """
+    State provider for the GitHub OAuth flow which signs an expiry time and a random nonce with HMAC-SHA256,
+    this is several times faster than `StateProvider` and doesn't require `PyJWT`.
+
+    The state has the form `{expiry}.{nonce}.{signature}`, where the signature is truncated to 128 bits.
+
+    If `check_replay` is `True`, the nonce of each valid state is remembered until the state expires, so a state can
+    only be used once. Remembered nonces are kept in memory by each process, and at most `max_nonces` are kept,
+    the oldest are forgotten first.
+    """
+
+    def __init__(
+        self,
+        secret: SecretStr,
+        max_age: timedelta = timedelta(minutes=5),
+        *,
+        check_replay: bool = False,
+        max_nonces: int = 10_000,
+    ):
+        self._key = secret.get_secret_value().encode()
+        self._max_age = int(max_age.total_seconds())
+        self._check_replay = check_replay
+        self._max_nonces = max_nonces
+        # nonce -> expiry, in insertion order which is also expiry order
+        self._nonces: OrderedDict[str, int] = OrderedDict()
+
+    async def new_state(self) -> str:
+        payload = f'{int(time.time()) + self._max_age:x}.{secrets.token_urlsafe(9)}'
+        return f'{payload}.{self._sign(payload)}'
+
+    async def check_state(self, state: str) -> bool:
+        if not state.isascii():
+            # the state comes from the request, and `compare_digest` raises an error for non-ASCII strings
+            return False
+        payload, _, signature = state.rpartition('.')
+        expiry_hex, _, nonce = payload.partition('.')
+        if not nonce or not hmac.compare_digest(signature, self._sign(payload)):
+            return False
+        try:
+            expiry = int(expiry_hex, 16)
+        except ValueError:
+            return False
+        now = int(time.time())
+        if expiry <= now:
+            return False
+
+        if self._check_replay:
+            nonces = self._nonces
+            while nonces and next(iter(nonces.values())) <= now:
+                nonces.popitem(last=False)
+            if nonce in nonces:
+                return False
+            nonces[nonce] = expiry
+            if len(nonces) > self._max_nonces:
+                nonces.popitem(last=False)
+        return True
+
+    def _sign(self, payload: str) -> str:
+        digest = hmac.new(self._key, payload.encode(), hashlib.sha256).digest()[:16]
+        return base64.urlsafe_b64encode(digest).rstrip(b'=').decode()
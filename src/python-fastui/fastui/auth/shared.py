@@ -1,5 +1,6 @@
 import json
 from abc import ABC, abstractmethod
+from functools import lru_cache
 from typing import TYPE_CHECKING, Union
 
 from .. import AnyComponent, FastUI, events
@@ -20,6 +21,14 @@ class AuthException(ABC, Exception):
     def response_data(self) -> tuple[int, str]:
         raise NotImplementedError
 
+    def response_body(self) -> tuple[int, bytes]:
+        """
+        Status code and encoded body of the response, subclasses can override this to avoid encoding the body
+        from `response_data` for every response.
+        """
+        status_code, body = self.response_data()
+        return status_code, body.encode()
+
 
 class AuthError(AuthException):
     def __init__(self, message: str, *, code: str):
@@ -27,7 +36,13 @@ class AuthError(AuthException):
         self.code = code
 
     def response_data(self) -> tuple[int, str]:
-        return 401, json.dumps({'detail': str(self)})
+        return 401, _error_body(str(self)).decode()
+
+    def response_body(self) -> tuple[int, bytes]:
+        # subclasses overriding `response_data` must still have their body used
+        if type(self).response_data is not AuthError.response_data:
+            return super().response_body()
+        return 401, _error_body(str(self))
 
 
 class AuthRedirect(AuthException):
@@ -42,8 +57,25 @@ class AuthRedirect(AuthException):
         self.message = message
 
     def response_data(self) -> tuple[int, str]:
-        components: list[AnyComponent] = [c.FireEvent(event=events.GoToEvent(url=self.path), message=self.message)]
-        return 345, FastUI(root=components).model_dump_json(exclude_none=True)
+        return 345, _redirect_body(self.path, self.message).decode()
+
+    def response_body(self) -> tuple[int, bytes]:
+        # subclasses overriding `response_data` must still have their body used
+        if type(self).response_data is not AuthRedirect.response_data:
+            return super().response_body()
+        return 345, _redirect_body(self.path, self.message)
+
+
+# bodies are cached since the same few redirects and errors are returned for every unauthenticated request
+@lru_cache(maxsize=1024)
+def _error_body(message: str) -> bytes:
+    return json.dumps({'detail': message}).encode()
+
+
+@lru_cache(maxsize=1024)
+def _redirect_body(path: str, message: Union[str, None]) -> bytes:
+    components: list[AnyComponent] = [c.FireEvent(event=events.GoToEvent(url=path), message=message)]
+    return FastUI(root=components).model_dump_json(exclude_none=True).encode()
 
 
 def fastapi_auth_exception_handling(app: 'FastAPI') -> None:
@@ -54,5 +86,5 @@ def fastapi_auth_exception_handling(app: 'FastAPI') -> None:
 
     @app.exception_handler(AuthException)
     def auth_exception_handler(_request: Request, e: AuthException) -> Response:
-        status_code, body = e.response_data()
+        status_code, body = e.response_body()
         return Response(body, media_type='application/json', status_code=status_code)
@@ -18,14 +18,16 @@ from .forms import (
     BaseForm,
     Form,
     FormField,
+    FormFieldArray,
     FormFieldBoolean,
     FormFieldFile,
     FormFieldInput,
     FormFieldSelect,
     FormFieldSelectSearch,
+    FormFieldUnion,
     ModelForm,
 )
-from .tables import Pagination, Table
+from .tables import CursorPagination, Pagination, Table
 
 __all__ = (
     # first we include all components from this file
@@ -54,6 +56,7 @@ __all__ = (
     # then we include components from other files
     'Table',
     'Pagination',
+    'CursorPagination',
     'Display',
     'Details',
     'Form',
@@ -63,14 +66,34 @@ __all__ = (
     # then `AnyComponent` itself
     'AnyComponent',
     # then the other form field types which are included in `AnyComponent` via the `FormField` union
+    'FormFieldArray',
     'FormFieldBoolean',
     'FormFieldFile',
     'FormFieldInput',
     'FormFieldSelect',
     'FormFieldSelectSearch',
+    'FormFieldUnion',
 )
 
 
+def _validate_components(value: _t.Any, handler: _core_schema.ValidatorFunctionWrapHandler) -> _t.Any:
+    """
+    Wrap validator for lists of components which skips validation when every item is already an instance of
+    a component class, e.g. components constructed in Python and then nested inside a `Div`.
+
+    Anything else, including instances of component subclasses, is validated as normal.
+    """
+    if isinstance(value, list) and all(type(item) in _COMPONENT_TYPES for item in value):
+        # copy the list, like validation would, so the caller's list isn't shared with the model
+        return list(value)
+    else:
+        return handler(value)
+
+
+def _trusted_components(*fields: str) -> _t.Any:
+    return _p.field_validator(*fields, mode='wrap')(_validate_components)
+
+
 class Text(BaseModel, extra='forbid'):
     """Text component that displays a string."""
 
@@ -116,6 +139,8 @@ class Div(BaseModel, defer_build=True, extra='forbid'):
     type: _t.Literal['Div'] = 'Div'
     """The type of the component. Always 'Div'."""
 
+    _trust_components = _trusted_components('components')
+
 
 class Page(BaseModel, defer_build=True, extra='forbid'):
     """Similar to `container` in many UI frameworks, this acts as a root component for most pages."""
@@ -129,6 +154,8 @@ class Page(BaseModel, defer_build=True, extra='forbid'):
     type: _t.Literal['Page'] = 'Page'
     """The type of the component. Always 'Page'."""
 
+    _trust_components = _trusted_components('components')
+
 
 class Heading(BaseModel, extra='forbid'):
     """Heading component."""
@@ -266,6 +293,8 @@ class Link(BaseModel, defer_build=True, extra='forbid'):
     type: _t.Literal['Link'] = 'Link'
     """The type of the component. Always 'Link'."""
 
+    _trust_components = _trusted_components('components')
+
 
 class LinkList(BaseModel, extra='forbid'):
     """List of Link components."""
@@ -355,6 +384,8 @@ class Modal(BaseModel, defer_build=True, extra='forbid'):
     type: _t.Literal['Modal'] = 'Modal'
     """The type of the component. Always 'Modal'."""
 
+    _trust_components = _trusted_components('body', 'footer')
+
 
 class ServerLoad(BaseModel, defer_build=True, extra='forbid'):
     """A component that will be replaced by the server with the component returned by the given URL."""
@@ -380,6 +411,8 @@ class ServerLoad(BaseModel, defer_build=True, extra='forbid'):
     type: _t.Literal['ServerLoad'] = 'ServerLoad'
     """The type of the component. Always 'ServerLoad'."""
 
+    _trust_components = _trusted_components('components')
+
 
 class Image(BaseModel, extra='forbid'):
     """Image container component."""
@@ -581,6 +614,8 @@ class Toast(BaseModel, defer_build=True, extra='forbid'):
     type: _t.Literal['Toast'] = 'Toast'
     """The type of the component. Always 'Toast'."""
 
+    _trust_components = _trusted_components('body')
+
 
 class Custom(BaseModel, extra='forbid'):
     """Custom component that allows for special data to be rendered."""
@@ -628,6 +663,7 @@ AnyComponent = _te.Annotated[
         Custom,
         Table,
         Pagination,
+        CursorPagination,
         Display,
         Details,
         Form,
@@ -641,6 +677,10 @@ AnyComponent = _te.Annotated[
 
 Pydantic discriminator field is set to 'type' to allow for efficient serialization and deserialization of the components."""
 
+_COMPONENT_TYPES: frozenset[type] = frozenset(
+    t for arg in _t.get_args(_t.get_args(AnyComponent)[0]) for t in (_t.get_args(arg) or (arg,))
+)
+
 # Rebuild models:
 BaseForm.model_rebuild(_types_namespace={'AnyComponent': AnyComponent})
 Form.model_rebuild(_types_namespace={'AnyComponent': AnyComponent})
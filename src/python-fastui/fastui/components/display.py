@@ -1,4 +1,5 @@
 import enum
+import re
 import typing as _t
 from abc import ABC
 
@@ -95,6 +96,11 @@ class Details(BaseModel, extra='forbid'):
                     field.title = field.title
         return self
 
+    @pydantic.field_serializer('data')
+    def _serialize_data(self, data: pydantic.BaseModel, info: pydantic.FieldSerializationInfo):
+        # only the fields `fields` display are sent to the frontend
+        return dump_data_fields(data, set(data_fields(self.fields or [])), info)
+
     @classmethod
     def __get_pydantic_json_schema__(
         cls, core_schema: _core_schema.CoreSchema, handler: pydantic.GetJsonSchemaHandler
@@ -103,3 +109,36 @@ class Details(BaseModel, extra='forbid'):
         schema_def = handler.resolve_ref_schema(json_schema)
         schema_def['required'].append('fields')
         return json_schema
+
+
+_template_key_re = re.compile(r'{(.+?)}')
+
+
+def data_fields(lookups: _t.Iterable[_t.Union[DisplayLookup, Display]]) -> list[str]:
+    """
+    Names of the data fields the frontend reads to render `lookups`: the looked up fields themselves, plus any
+    fields substituted into `{field}` placeholders in `GoToEvent` URLs.
+    """
+    fields: dict[str, None] = {}
+    for lookup in lookups:
+        if isinstance(lookup, DisplayLookup):
+            fields[lookup.field] = None
+        if isinstance(lookup.on_click, events.GoToEvent) and lookup.on_click.url:
+            fields.update(dict.fromkeys(_template_key_re.findall(lookup.on_click.url)))
+    return list(fields)
+
+
+def dump_data_fields(data: pydantic.BaseModel, include: set[str], info: pydantic.FieldSerializationInfo) -> _t.Any:
+    """
+    Serialize only the `include` fields of `data`, using the model's own serializer as `SerializeAsAny` would.
+    """
+    return data.__pydantic_serializer__.to_python(
+        data,
+        mode=info.mode,
+        include=include,
+        by_alias=info.by_alias,
+        exclude_unset=info.exclude_unset,
+        exclude_defaults=info.exclude_defaults,
+        exclude_none=info.exclude_none,
+        round_trip=info.round_trip,
+    )
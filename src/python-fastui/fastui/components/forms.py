@@ -157,8 +157,55 @@ class FormFieldSelectSearch(BaseFormField):
     """The type of the component. Always 'FormFieldSelectSearch'."""
 
 
+class FormFieldArray(BaseFormField):
+    """Form field for a variable number of rows, each row is rendered in the browser from a template of fields."""
+
+    item_fields: 'list[FormField]'
+    """Fields for one row, `{index}` in each field's name is replaced with the row's index."""
+
+    min_items: _t.Union[int, None] = None
+    """Minimum number of rows, also the number of rows displayed initially."""
+
+    max_items: _t.Union[int, None] = None
+    """Maximum number of rows."""
+
+    type: _t.Literal['FormFieldArray'] = 'FormFieldArray'
+    """The type of the component. Always 'FormFieldArray'."""
+
+
+class FormFieldUnion(BaseFormField):
+    """Form field for a discriminated union, a variant is selected then the fields of that variant are displayed."""
+
+    options: forms.SelectOptions
+    """Options for selecting the variant, each option's value is the variant's discriminator value."""
+
+    initial: _t.Union[str, None] = None
+    """Initially selected variant."""
+
+    variants_url: _t.Union[str, None] = None
+    """URL to load the fields of the selected variant from, with `name` and `variant` as query parameters."""
+
+    variant_fields: '_t.Union[dict[str, list[FormField]], None]' = None
+    """Fields of every variant, keyed by discriminator value, used when `variants_url` isn't set."""
+
+    type: _t.Literal['FormFieldUnion'] = 'FormFieldUnion'
+    """The type of the component. Always 'FormFieldUnion'."""
+
+    _load_variant: '_t.Union[_t.Callable[[list[_t.Union[str, int]], _t.Any, str], list[FormField]], None]' = (
+        pydantic.PrivateAttr(None)
+    )
+    """Generates the fields of a variant at a location, set when the field is generated from a model."""
+
+
 FormField = _t.Union[
-    FormFieldInput, FormFieldTextarea, FormFieldBoolean, FormFieldFile, FormFieldSelect, FormFieldSelectSearch
+    FormFieldInput,
+    FormFieldTextarea,
+    FormFieldBoolean,
+    FormFieldFile,
+    FormFieldSelect,
+    FormFieldSelectSearch,
+    FormFieldArray,
+    FormFieldUnion,
 ]
 """Union of all form field types."""
 
@@ -27,6 +27,11 @@ class Table(BaseModel, extra='forbid'):
     no_data_message: _t.Union[str, None] = None
     """Message to display when there is no data."""
 
+    columnar: _t.Union[bool, None] = None
+    """If `True`, `data` is serialized as one array per column rather than one object per row.
+
+    Only the fields used by `columns` (including those referenced in `GoToEvent` URLs) are included."""
+
     class_name: _class_name.ClassNameField = None
     """Optional class name to apply to the paragraph's HTML component."""
 
@@ -56,6 +61,22 @@ class Table(BaseModel, extra='forbid'):
                     column.title = field.title
         return self
 
+    @pydantic.field_serializer('data')
+    def _serialize_data(self, data: _t.Sequence[pydantic.BaseModel], info: pydantic.FieldSerializationInfo):
+        # only the fields `columns` display are sent to the frontend
+        fields = display.data_fields(self.columns or [])
+        include = set(fields)
+        if not self.columnar:
+            return [display.dump_data_fields(row, include, info) for row in data]
+
+        columns: dict[str, list[_t.Any]] = {field: [] for field in fields}
+        for row in data:
+            # column values are keyed by field name, and `None` is kept so every column has a value for each row
+            row_dict = row.__pydantic_serializer__.to_python(row, mode=info.mode, include=include)
+            for field, values in columns.items():
+                values.append(row_dict.get(field))
+        return columns
+
     @classmethod
     def __get_pydantic_json_schema__(
         cls, core_schema: _core_schema.CoreSchema, handler: pydantic.GetJsonSchemaHandler
@@ -64,6 +85,12 @@ class Table(BaseModel, extra='forbid'):
         schema_def = handler.resolve_ref_schema(json_schema)
         # columns are filled by `_fill_columns`
         schema_def['required'].append('columns')
+        if handler.mode == 'serialization':
+            # with `columnar=True`, data is serialized as `{field: [value, ...]}` by `_serialize_data`
+            rows_schema = schema_def['properties']['data']
+            value_schema = handler.resolve_ref_schema(rows_schema['items'])['additionalProperties']
+            columns_schema = {'type': 'object', 'additionalProperties': {'type': 'array', 'items': value_schema}}
+            schema_def['properties']['data'] = {'anyOf': [rows_schema, columns_schema]}
         return json_schema
 
 
@@ -79,6 +106,9 @@ class Pagination(BaseModel):
     total: int
     """The total number of items."""
 
+    total_is_estimate: _t.Union[bool, None] = None
+    """Whether `total` is only an estimate, if so the last page isn't linked to."""
+
     page_query_param: str = 'page'
     """The query parameter to use for the page number."""
 
@@ -91,3 +121,26 @@ class Pagination(BaseModel):
     @pydantic.computed_field(alias='pageCount')
     def page_count(self) -> int:
         return (self.total - 1) // self.page_size + 1
+
+
+class CursorPagination(BaseModel):
+    """Cursor (keyset) based pagination component to use with tables, where the total number of items isn't known."""
+
+    next_cursor: _t.Union[str, None] = None
+    """Opaque cursor for the next page, `None` if there is no next page."""
+
+    prev_cursor: _t.Union[str, None] = None
+    """Opaque cursor for the previous page, `None` if there is no previous page,
+    an empty string links to the first page by removing the cursor from the query."""
+
+    has_more: _t.Union[bool, None] = None
+    """Whether there are more items after this page, if `None` this is inferred from `next_cursor`."""
+
+    cursor_query_param: str = 'cursor'
+    """The query parameter to use for the cursor."""
+
+    class_name: _class_name.ClassNameField = None
+    """Optional class name to apply to the pagination's HTML component."""
+
+    type: _t.Literal['CursorPagination'] = 'CursorPagination'
+    """The type of the component. Always 'CursorPagination'."""
@@ -1,6 +1,10 @@
 import json
+import threading
 import typing as _t
-from itertools import groupby
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from itertools import chain, groupby
 from mimetypes import MimeTypes
 from operator import itemgetter
 
@@ -13,13 +17,14 @@ try:
     import fastapi
     from fastapi import params as fastapi_params
     from starlette import datastructures as ds
+    from starlette.formparsers import MultiPartException, MultiPartParser
 except ImportError as _e:
     raise ImportError('fastui.dev requires fastapi to be installed, install with `pip install fastui[fastapi]`') from _e
 
 if _t.TYPE_CHECKING:
     from . import json_schema
 
-__all__ = 'FastUIForm', 'fastui_form', 'FormFile', 'Textarea', 'SelectSearchResponse', 'SelectOption'
+__all__ = 'FastUIForm', 'fastui_form', 'FormFile', 'AcceptMatcher', 'Textarea', 'SelectSearchResponse', 'SelectOption'
 
 FormModel = _t.TypeVar('FormModel', bound=pydantic.BaseModel)
 
@@ -33,28 +38,407 @@ class FastUIForm(_t.Generic[FormModel]):
         return fastui_form(model)
 
 
-def fastui_form(model: type[FormModel]) -> fastapi_params.Depends:
+def fastui_form(
+    model: type[FormModel],
+    *,
+    streaming: bool = False,
+    spool_max_size: int = 1024 * 1024,
+    max_total_file_size: _t.Union[int, None] = None,
+) -> fastapi_params.Depends:
+    """
+    Create a FastAPI dependency which parses and validates form data submitted by a `ModelForm`.
+
+    Arguments:
+        model: the pydantic model to validate the form data with.
+        streaming: if `True`, multipart bodies are parsed as they're received and `FormFile` limits are checked
+            for each file as it arrives, so a file which is too big or of the wrong type is rejected without waiting
+            for the rest of the upload. Uploaded files are kept open until the endpoint returns.
+        spool_max_size: with `streaming=True`, uploaded files larger than this many bytes are written to disk
+            rather than kept in memory.
+        max_total_file_size: the maximum combined size in bytes of all files in the form, with `streaming=True`
+            the upload is stopped as soon as it's exceeded.
+
+    Returns:
+        The dependency.
+    """
+    adapter = _form_adapter(model)
+    to_model_data = adapter.model_data if adapter is not None else unflatten
+
+    if streaming:
+        form_files = form_file_fields(model)
+        allowed_names = adapter if adapter is not None and adapter.forbid_extra else None
+
+        async def run_fastui_form_streaming(request: fastapi.Request):
+            form_data = await _parse_form_streaming(
+                request, form_files, spool_max_size, max_total_file_size, allowed_names
+            )
+            try:
+                yield _validate_form(model, to_model_data(form_data))
+            finally:
+                await form_data.close()
+
+        return fastapi.Depends(run_fastui_form_streaming)
+
     async def run_fastui_form(request: fastapi.Request):
         async with request.form() as form_data:
-            model_data = unflatten(form_data)
-
-        try:
-            return model.model_validate(model_data)
-        except pydantic.ValidationError as e:
-            raise fastapi.HTTPException(
-                status_code=422,
-                detail={'form': e.errors(include_input=False, include_url=False, include_context=False)},
-            )
+            if max_total_file_size is not None:
+                _check_total_file_size(form_data, max_total_file_size)
+            # validate before the files are closed, since `FormFile(sniff=True)` reads them
+            return _validate_form(model, to_model_data(form_data))
 
     return fastapi.Depends(run_fastui_form)
 
 
+def _validate_form(model: type[FormModel], model_data: 'NestedDict') -> FormModel:
+    try:
+        return model.model_validate(model_data)
+    except pydantic.ValidationError as e:
+        raise fastapi.HTTPException(
+            status_code=422,
+            detail={'form': e.errors(include_input=False, include_url=False, include_context=False)},
+        )
+
+
+class _FormAdapter:
+    """
+    Converts submitted form data for one model directly to the data to validate, see `_form_adapter`.
+
+    `locs` holds the location of each field keyed by its form name, form data with other names is passed to
+    `unflatten`, or rejected if `forbid_extra` is set and the name isn't another spelling of a known location.
+    """
+
+    __slots__ = 'locs', 'loc_values', 'forbid_extra'
+
+    def __init__(self, locs: dict[str, tuple[str, ...]], forbid_extra: bool):
+        self.locs = locs
+        self.loc_values = [list(loc) for loc in locs.values()]
+        self.forbid_extra = forbid_extra
+
+    def model_data(self, form_data: ds.FormData) -> 'NestedDict':
+        """
+        Build the data to validate from form data, the result is the same as `unflatten`'s.
+
+        Unknown fields raise a 422 `HTTPException` if `forbid_extra` is set, otherwise the form data is passed to
+        `unflatten` so nothing submitted is dropped.
+        """
+        result_dict: NestedDict = {}
+        locs = self.locs
+        # consecutive values with the same key are collected in one pass, the `None` key at the end flushes the last
+        key: _t.Union[str, None] = None
+        values: list[_t.Any] = []
+        for next_key, value in chain(form_data.multi_items(), ((None, None),)):
+            if next_key == key:
+                values.append(value)
+                continue
+
+            if key is not None:
+                loc = locs.get(key)
+                if loc is None:
+                    if self.forbid_extra and key not in self:
+                        raise fastapi.HTTPException(status_code=422, detail={'form': [_extra_field_error(key)]})
+                    return unflatten(form_data)
+                elif values != ['']:
+                    d: dict[_t.Union[str, int], _t.Any] = result_dict
+                    for part in loc[:-1]:
+                        child = d.get(part)
+                        if child is None:
+                            d[part] = child = {}
+                        d = child
+                    d[loc[-1]] = values[0] if len(values) == 1 else values
+            key, values = next_key, [value]
+        return result_dict
+
+    def __contains__(self, name: object) -> bool:
+        """
+        Whether `name` is the name of a field, including other spellings of its location, e.g. JSON encoded.
+        """
+        return isinstance(name, str) and (name in self.locs or name_to_loc(name) in self.loc_values)
+
+
+@lru_cache(maxsize=256)
+def _form_adapter(model: type[pydantic.BaseModel]) -> _t.Union[_FormAdapter, None]:
+    """
+    Compile a `_FormAdapter` from the form fields of `model`, this is done once per model.
+
+    `None` is returned if form data for the model needs the generic `unflatten`, this is the case if the model
+    can't be rendered as a form, has fields at indexed locations, like tuples and arrays, has unions, whose fields
+    depend on the selected variant, has fields without a form field, like dicts, or allows extra fields.
+    """
+    from .json_schema import model_json_schema_to_fields
+
+    extra = model.model_config.get('extra')
+    if extra == 'allow':
+        return None
+    try:
+        fields = model_json_schema_to_fields(model)
+    except Exception:
+        # the dependency must still work for models which can't be rendered as a form
+        return None
+
+    locs: dict[str, tuple[str, ...]] = {}
+    for field in fields:
+        if field.type in ('FormFieldArray', 'FormFieldUnion'):
+            return None
+        loc = tuple(name_to_loc(field.name))
+        if not all(isinstance(part, str) for part in loc):
+            return None
+        locs[field.name] = _t.cast(tuple[str, ...], loc)
+
+    covered = {loc[:i] for loc in locs.values() for i in range(1, len(loc) + 1)}
+    if not _fields_covered(model, (), covered):
+        return None
+    return _FormAdapter(locs, extra == 'forbid')
+
+
+def _fields_covered(model: type[pydantic.BaseModel], loc: tuple[str, ...], covered: set[tuple[str, ...]]) -> bool:
+    """
+    Check every field of `model` and of its nested models is at or within a location in `covered`.
+    """
+    for name, field in model.model_fields.items():
+        field_loc = (*loc, field.alias or name)
+        if field_loc not in covered:
+            return False
+        for arg in _t.get_args(field.annotation) or (field.annotation,):
+            if isinstance(arg, type) and issubclass(arg, pydantic.BaseModel):
+                if not _fields_covered(arg, field_loc, covered):
+                    return False
+    return True
+
+
+def _extra_field_error(name: str) -> dict[str, _t.Any]:
+    return {'type': 'extra_forbidden', 'loc': tuple(name_to_loc(name)), 'msg': 'Extra inputs are not permitted'}
+
+
+def form_file_fields(model: type[pydantic.BaseModel]) -> dict[str, 'FormFile']:
+    """
+    Find the `FormFile` of each file field in `model` and its nested models, keyed by the field's form name.
+    """
+    from .json_schema import loc_to_name
+
+    form_files: dict[str, FormFile] = {}
+
+    def find_form_files(m: type[pydantic.BaseModel], loc: 'json_schema.SchemeLocation') -> None:
+        for name, field in m.model_fields.items():
+            field_loc = [*loc, field.alias or name]
+            form_file = next((meta for meta in field.metadata if isinstance(meta, FormFile)), None)
+            if form_file is not None:
+                form_files[loc_to_name(field_loc)] = form_file
+            elif isinstance(field.annotation, type) and issubclass(field.annotation, pydantic.BaseModel):
+                find_form_files(field.annotation, field_loc)
+
+    find_form_files(model, [])
+    return form_files
+
+
+def _check_total_file_size(form_data: ds.FormData, max_total_file_size: int) -> None:
+    total = 0
+    for name, value in form_data.multi_items():
+        if isinstance(value, ds.UploadFile) and value.size:
+            total += value.size
+            if total > max_total_file_size:
+                error = _total_size_error(max_total_file_size)
+                raise fastapi.HTTPException(status_code=422, detail={'form': [_FormPartError(name, error).detail]})
+
+
+def _total_size_error(max_total_file_size: int) -> pydantic_core.PydanticCustomError:
+    return pydantic_core.PydanticCustomError(
+        'files_too_big',
+        'Total size of uploaded files exceeds maximum allowed size of {max_size}',
+        {'max_size': pydantic.ByteSize(max_total_file_size).human_readable()},
+    )
+
+
+async def _parse_form_streaming(
+    request: fastapi.Request,
+    form_files: dict[str, 'FormFile'],
+    spool_max_size: int,
+    max_total_file_size: _t.Union[int, None],
+    allowed_names: _t.Union[_t.Container[str], None],
+) -> ds.FormData:
+    if not request.headers.get('content-type', '').startswith('multipart/form-data'):
+        # url encoded forms can't contain files
+        return await request.form()
+
+    parser = _StreamingMultiPartParser(
+        request.headers, request.stream(), form_files, spool_max_size, max_total_file_size, allowed_names
+    )
+    try:
+        return await parser.parse()
+    except _FormPartError as e:
+        raise fastapi.HTTPException(status_code=422, detail={'form': [e.detail]})
+    except MultiPartException as e:
+        raise fastapi.HTTPException(status_code=400, detail=e.message)
+
+
+class _FormPartError(MultiPartException):
+    def __init__(self, field_name: str, error: pydantic_core.PydanticCustomError):
+        super().__init__(error.message())
+        self.detail = {'type': error.type, 'loc': tuple(name_to_loc(field_name)), 'msg': error.message()}
+
+
+class _StreamingMultiPartParser(MultiPartParser):
+    """
+    Multipart parser which checks `FormFile` constraints as each file is received.
+
+    Raising from a parser callback stops reading the request body, and starlette closes any files already created.
+    """
+
+    def __init__(
+        self,
+        headers: ds.Headers,
+        stream: _t.AsyncGenerator[bytes, None],
+        form_files: dict[str, 'FormFile'],
+        spool_max_size: int,
+        max_total_file_size: _t.Union[int, None] = None,
+        allowed_names: _t.Union[_t.Container[str], None] = None,
+    ):
+        super().__init__(headers, stream)
+        # used as the `max_size` of the `SpooledTemporaryFile` each file is written to
+        self.max_file_size = spool_max_size
+        self._form_files = form_files
+        self._max_total_file_size = max_total_file_size
+        self._allowed_names = allowed_names
+        self._current_form_file: _t.Union[FormFile, None] = None
+        self._current_file_size = 0
+        self._total_file_size = 0
+
+    def on_headers_finished(self) -> None:
+        super().on_headers_finished()
+        part = self._current_part
+        if self._allowed_names is not None and part.field_name not in self._allowed_names:
+            raise _FormPartError(
+                part.field_name, pydantic_core.PydanticCustomError('extra_forbidden', 'Extra inputs are not permitted')
+            )
+        self._current_file_size = 0
+        self._current_form_file = None
+        if part.file is not None and part.file.filename:
+            # an empty filename means no file was selected
+            self._current_form_file = form_file = self._form_files.get(part.field_name)
+            # files which are sniffed are checked against `accept` once their content has been received
+            if form_file is not None and not form_file.sniff:
+                try:
+                    form_file.validate_accept(part.file)
+                except pydantic_core.PydanticCustomError as e:
+                    raise _FormPartError(part.field_name, e)
+
+    def on_part_data(self, data: bytes, start: int, end: int) -> None:
+        if self._current_part.file is not None:
+            self._current_file_size += end - start
+            self._total_file_size += end - start
+            # the rest of the upload isn't read, so sizes in errors are the limits, not the actual size
+            form_file = self._current_form_file
+            if (
+                form_file is not None
+                and form_file.max_size is not None
+                and self._current_file_size > form_file.max_size
+            ):
+                raise _FormPartError(self._current_part.field_name, form_file.size_error(None))
+            if self._max_total_file_size is not None and self._total_file_size > self._max_total_file_size:
+                raise _FormPartError(self._current_part.field_name, _total_size_error(self._max_total_file_size))
+        super().on_part_data(data, start, end)
+
+
+class AcceptMatcher:
+    """
+    File type criteria compiled from an HTML `accept` string, e.g. `"image/*,.pdf"`.
+
+    See https://developer.mozilla.org/en-US/docs/Web/HTML/Element/input/file#unique_file_type_specifiers
+    for details on what's allowed. Like browsers, matching is case-insensitive.
+
+    Attributes:
+        specs: the individual file type specifiers.
+        any: whether any file is accepted, i.e. the specifiers include `*/*`.
+        extensions: accepted file extensions, including the leading `.`.
+        mime_types: accepted exact MIME types.
+        mime_prefixes: accepted MIME type prefixes from specifiers like `image/*`, including the trailing `/`.
+        stats: counts of files `accepted`, and of those rejected by reason, see `rejection_reason`.
+    """
+
+    __slots__ = 'specs', 'any', 'extensions', 'mime_types', 'mime_prefixes', 'stats', '_lock'
+
+    def __init__(self, accept: str):
+        self.specs: tuple[str, ...] = tuple(spec for spec in (a.strip() for a in accept.split(',')) if spec)
+        self.any = False
+        self.extensions: set[str] = set()
+        self.mime_types: set[str] = set()
+        self.mime_prefixes: set[str] = set()
+        self.stats: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+        for spec in self.specs:
+            spec = spec.lower()
+            if spec == '*/*':
+                self.any = True
+            elif spec.startswith('.'):
+                self.extensions.add(spec)
+            elif spec.endswith('/*'):
+                self.mime_prefixes.add(spec[:-1])
+            else:
+                self.mime_types.add(spec)
+
+    @property
+    def accept(self) -> str:
+        """
+        The normalised `accept` string, as used in the JSON Schema.
+        """
+        return ','.join(self.specs)
+
+    def matches(self, filename: _t.Union[str, None], content_type: _t.Union[str, None]) -> bool:
+        """
+        Check whether a file matches, and record the result in `stats`.
+        """
+        reason = self.rejection_reason(filename, content_type)
+        with self._lock:
+            self.stats[reason or 'accepted'] += 1
+        return reason is None
+
+    def rejection_reason(self, filename: _t.Union[str, None], content_type: _t.Union[str, None]) -> _t.Union[str, None]:
+        """
+        Find why a file doesn't match, `None` if it does.
+
+        Reasons are `no_content_type` if the extension doesn't match and the content type is unknown,
+        or `content_type` if neither the extension nor content type match.
+        """
+        if self.any:
+            return None
+        if filename and self.extensions:
+            filename = filename.lower()
+            # check every suffix, so multi-part extensions like `.tar.gz` match
+            dot = filename.find('.', 1)
+            while dot != -1:
+                if filename[dot:] in self.extensions:
+                    return None
+                dot = filename.find('.', dot + 1)
+        if not content_type:
+            return 'no_content_type'
+        content_type = content_type.lower()
+        if content_type in self.mime_types:
+            return None
+        slash = content_type.find('/')
+        if slash != -1 and content_type[: slash + 1] in self.mime_prefixes:
+            return None
+        return 'content_type'
+
+    def __repr__(self):
+        return f'AcceptMatcher({self.accept!r})'
+
+
 class FormFile:
-    __slots__ = 'accept', 'max_size'
+    __slots__ = 'accept', 'max_size', 'sniff', 'accept_matcher'
 
-    def __init__(self, accept: _t.Union[str, None] = None, max_size: _t.Union[int, None] = None):
+    def __init__(self, accept: _t.Union[str, None] = None, max_size: _t.Union[int, None] = None, sniff: bool = False):
+        """
+        Arguments:
+            accept: comma separated file extensions and MIME types the file must match, as used by the HTML
+                `accept` attribute.
+            max_size: the maximum file size in bytes.
+            sniff: if `True`, the content type checked against `accept` is detected from the first bytes of the file
+                where possible, rather than trusting the content type sent by the client.
+        """
         self.accept = accept
         self.max_size = max_size
+        self.sniff = sniff
+        self.accept_matcher = AcceptMatcher(accept) if accept is not None else None
 
     def validate_single(self, input_value: _t.Any) -> ds.UploadFile:
         if isinstance(input_value, ds.UploadFile):
@@ -66,6 +450,9 @@ class FormFile:
 
     def validate_multiple(self, input_value: _t.Any) -> list[ds.UploadFile]:
         if isinstance(input_value, list):
+            if self.sniff and len(input_value) > 1:
+                # sniffing reads from each file, which may be on disk, so files are validated concurrently
+                return list(_get_validation_executor().map(self.validate_single, input_value))
             return [self.validate_single(v) for v in input_value]
         else:
             return [self.validate_single(input_value)]
@@ -75,38 +462,57 @@ class FormFile:
         See https://developer.mozilla.org/en-US/docs/Web/HTML/Element/input/file#unique_file_type_specifiers
         for details on what's allowed.
         """
-        if file.size == 0:
-            # FIXME is this right???
+        if file.size == 0 and not file.filename:
+            # browsers send an empty file without a name when no file is selected
             return
 
         if self.max_size is not None and file.size is not None and file.size > self.max_size:
-            raise pydantic_core.PydanticCustomError(
+            raise self.size_error(file.size)
+
+        if self.sniff and self.accept_matcher is not None:
+            content_type = sniff_content_type(file)
+            if content_type in _CONTAINER_CONTENT_TYPES and self.accept_matcher.rejection_reason(
+                file.filename, content_type
+            ):
+                # many formats use these containers, e.g. docx files are zip files, so the sniffed content type
+                # doesn't rule the client's content type out, check that instead
+                content_type = None
+            self.validate_accept(file, content_type)
+        else:
+            self.validate_accept(file)
+
+    def size_error(self, file_size: _t.Union[int, None]) -> pydantic_core.PydanticCustomError:
+        """
+        Create the error for a file exceeding `max_size`, `file_size` is `None` if the upload was stopped early.
+        """
+        assert self.max_size is not None, 'size_error requires max_size'
+        if file_size is None:
+            return pydantic_core.PydanticCustomError(
                 'file_too_big',
-                'File size was {file_size}, exceeding maximum allowed size of {max_size}',
-                {
-                    'file_size': pydantic.ByteSize(file.size).human_readable(),
-                    'max_size': pydantic.ByteSize(self.max_size).human_readable(),
-                },
+                'File size exceeds maximum allowed size of {max_size}',
+                {'max_size': pydantic.ByteSize(self.max_size).human_readable()},
             )
+        return pydantic_core.PydanticCustomError(
+            'file_too_big',
+            'File size was {file_size}, exceeding maximum allowed size of {max_size}',
+            {
+                'file_size': pydantic.ByteSize(file_size).human_readable(),
+                'max_size': pydantic.ByteSize(self.max_size).human_readable(),
+            },
+        )
+
+    def validate_accept(self, file: ds.UploadFile, content_type: _t.Union[str, None] = None) -> None:
+        """
+        Check the file's name and content type match `accept`, this only needs the file's headers, not its content.
 
-        if self.accept is None:
+        `content_type` overrides the content type from the file's headers, e.g. if it has been sniffed.
+        """
+        if self.accept_matcher is None:
             return
 
-        for accept in self.accept.split(','):
-            accept = accept.strip()
-            if accept == '*/*':
-                return
-            elif accept.startswith('.'):
-                # this is a file extension
-                if file.filename and file.filename.endswith(accept):
-                    return
-
-            if content_type := get_content_type(file):
-                if accept.endswith('/*'):
-                    if content_type.startswith(accept[:-1]):
-                        return
-                elif content_type == accept:
-                    return
+        content_type = content_type or get_content_type(file)
+        if self.accept_matcher.matches(file.filename, content_type):
+            return
 
         raise pydantic_core.PydanticCustomError(
             'accept_mismatch',
@@ -114,7 +520,7 @@ class FormFile:
                 'Uploaded file "{filename}" with content type "{content_type}" '
                 'does not match accept criteria "{accept}"'
             ),
-            {'filename': file.filename, 'content_type': file.content_type, 'accept': self.accept},
+            {'filename': file.filename, 'content_type': content_type or file.content_type, 'accept': self.accept},
         )
 
     def __get_pydantic_core_schema__(self, source_type: type[_t.Any], *_args) -> core_schema.CoreSchema:
@@ -131,8 +537,8 @@ class FormFile:
         from . import json_schema
 
         s = json_schema.JsonSchemaFile(type='string', format='binary')
-        if self.accept:
-            s['accept'] = self.accept
+        if self.accept_matcher and self.accept_matcher.specs:
+            s['accept'] = self.accept_matcher.accept
 
         function = core_schema_.get('function', {}).get('function')
         if function and function.__name__ == 'validate_multiple':
@@ -153,6 +559,70 @@ def get_content_type(file: ds.UploadFile) -> _t.Union[str, None]:
         return _mime_types.guess_type(file.filename)[0]
 
 
+# (offset, magic bytes, content type), checked in order
+_MAGIC_SIGNATURES: list[tuple[int, bytes, str]] = [
+    (0, b'\x89PNG\r\n\x1a\n', 'image/png'),
+    (0, b'\xff\xd8\xff', 'image/jpeg'),
+    (0, b'GIF87a', 'image/gif'),
+    (0, b'GIF89a', 'image/gif'),
+    (8, b'WEBP', 'image/webp'),
+    (0, b'BM', 'image/bmp'),
+    (0, b'II*\x00', 'image/tiff'),
+    (0, b'MM\x00*', 'image/tiff'),
+    (0, b'\x00\x00\x01\x00', 'image/vnd.microsoft.icon'),
+    (0, b'%PDF-', 'application/pdf'),
+    (0, b'PK\x03\x04', 'application/zip'),
+    (0, b'\x1f\x8b', 'application/gzip'),
+    (0, b'7z\xbc\xaf\x27\x1c', 'application/x-7z-compressed'),
+    (0, b'Rar!\x1a\x07', 'application/vnd.rar'),
+    (8, b'WAVE', 'audio/wav'),
+    (0, b'ID3', 'audio/mpeg'),
+    (0, b'OggS', 'audio/ogg'),
+    (0, b'fLaC', 'audio/flac'),
+    # ISO base media files, identified by their major brand where it's unambiguous
+    (4, b'ftypheic', 'image/heic'),
+    (4, b'ftypheix', 'image/heic'),
+    (4, b'ftypmif1', 'image/heif'),
+    (4, b'ftypavif', 'image/avif'),
+    (4, b'ftypM4A ', 'audio/mp4'),
+    (4, b'ftypqt  ', 'video/quicktime'),
+    (4, b'ftyp', 'video/mp4'),
+    (0, b'\x1a\x45\xdf\xa3', 'video/webm'),
+]
+# content types of generic containers which other formats are stored in, e.g. docx and jar files are zip files,
+# m4a files are mp4 files, so a file with one of these content types may match a more specific content type
+_CONTAINER_CONTENT_TYPES = {'application/zip', 'application/gzip', 'audio/ogg', 'video/mp4', 'video/webm'}
+_SNIFF_SIZE = 4096
+
+
+def sniff_content_type(file: ds.UploadFile) -> _t.Union[str, None]:
+    """
+    Detect the content type of a file from its first few KB, `None` if it's not recognised.
+
+    The file's position is left unchanged.
+    """
+    f = file.file
+    position = f.tell()
+    try:
+        head = f.read(_SNIFF_SIZE)
+    finally:
+        f.seek(position)
+    for offset, magic, content_type in _MAGIC_SIGNATURES:
+        if head.startswith(magic, offset):
+            return content_type
+    return None
+
+
+_validation_executor: _t.Union[ThreadPoolExecutor, None] = None
+
+
+def _get_validation_executor() -> ThreadPoolExecutor:
+    global _validation_executor
+    if _validation_executor is None:
+        _validation_executor = ThreadPoolExecutor(thread_name_prefix='fastui-form-file')
+    return _validation_executor
+
+
 class SelectOption(_te.TypedDict):
     value: str
     label: str
@@ -180,52 +650,69 @@ def unflatten(form_data: ds.FormData) -> NestedDict:
     Also omit empty strings, this might be a bit controversial, but it helps in many scenarios, e.g. a select
     which hasn't been updated. It also avoids empty values for string inputs that haven't been fill in.
     """
+    from .json_schema import form_names
+
     result_dict: NestedDict = {}
+    # containers whose first key is an int, with their parent, these become lists if all their keys are ints
+    indexed: list[tuple[dict[_t.Any, _t.Any], _t.Union[str, int], dict[_t.Any, _t.Any]]] = []
+
     for key, g in groupby(form_data.multi_items(), itemgetter(0)):
         values = [v for _, v in g]
         if values == ['']:
             continue
 
         d: dict[_t.Union[str, int], _t.Any] = result_dict
-
-        *path, last_key = name_to_loc(key)
-        for part in path:
-            if part not in d:
-                d[part] = {}
-            d = d[part]
+        loc = _name_to_loc(key, form_names)
+        last_index = len(loc) - 1
+        for index in range(last_index):
+            part = loc[index]
+            child = d.get(part)
+            if child is None:
+                d[part] = child = {}
+                if isinstance(loc[index + 1], int):
+                    indexed.append((d, part, child))
+            d = child
 
         if len(values) == 1:
-            d[last_key] = values[0]
+            d[loc[last_index]] = values[0]
         else:
-            d[last_key] = values
-
-    # this logic takes care of converting `dict[int, str]` to `list[str]`
-    # we recursively process each dict in `result_dict` and convert it to a list if all keys are ints
-    dicts = [result_dict]
-    while dicts:
-        d = dicts.pop()
-        for key, value in d.items():
-            if isinstance(value, dict):
-                if all(isinstance(k, int) for k in value):
-                    # sort key-value pairs based on the keys, then take just the values as a list
-                    d[key] = [v for _, v in sorted(value.items())]
-                else:
-                    dicts.append(value)
+            d[loc[last_index]] = values
+
+    # convert `dict[int, Any]` to `list[Any]`, children are converted before their parents since they were
+    # created after them, indexes are compacted so sparse indexes don't create empty items
+    for parent, part, container in reversed(indexed):
+        keys = list(container)
+        if all(isinstance(k, int) for k in keys):
+            if all(a < b for a, b in zip(keys, keys[1:])):
+                parent[part] = list(container.values())
+            else:
+                # sort key-value pairs based on the keys, then take just the values as a list
+                parent[part] = [v for _, v in sorted(container.items())]
 
     return result_dict
 
 
 def name_to_loc(name: str) -> 'json_schema.SchemeLocation':
+    from .json_schema import form_names
+
+    return list(_name_to_loc(name, form_names))
+
+
+def _name_to_loc(name: str, form_names: 'json_schema.FormNameRegistry') -> tuple[_t.Union[str, int], ...]:
+    loc = form_names.loc(name)
+    if loc is None:
+        # names which weren't rendered are parsed, and cached separately so submitted names can't change the names
+        # `loc_to_name` renders
+        loc = _parse_name(name)
+    return loc
+
+
+@lru_cache(maxsize=4096)
+def _parse_name(name: str) -> tuple[_t.Union[str, int], ...]:
     if name.startswith('['):
-        return json.loads(name)
+        return tuple(json.loads(name))
     else:
-        loc: 'json_schema.SchemeLocation' = []
-        for part in name.split('.'):
-            if part.isdigit():
-                loc.append(int(part))
-            else:
-                loc.append(part)
-        return loc
+        return tuple(int(part) if part.isdigit() else part for part in name.split('.'))
 
 
 # Use uppercase for consistency with pydantic.Field, which is also a function
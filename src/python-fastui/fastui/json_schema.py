@@ -1,33 +1,74 @@
 import json
 import re
+import threading
 import typing as _t
+from collections import OrderedDict
+from functools import lru_cache
 
 import typing_extensions as _ta
 from pydantic import BaseModel
 
 from .components.forms import (
     FormField,
+    FormFieldArray,
     FormFieldBoolean,
     FormFieldFile,
     FormFieldInput,
     FormFieldSelect,
     FormFieldSelectSearch,
     FormFieldTextarea,
+    FormFieldUnion,
     InputHtmlType,
 )
 
 if _t.TYPE_CHECKING:
+    from functools import _CacheInfo
+
     from .forms import SelectOption
 else:
     SelectOption = dict
 
-__all__ = 'model_json_schema_to_fields', 'SchemeLocation'
+__all__ = (
+    'model_json_schema_to_fields',
+    'model_fields_cache_info',
+    'model_fields_cache_clear',
+    'model_union_variant_fields',
+    'SchemeLocation',
+    'ARRAY_INDEX',
+    'FormNameRegistry',
+    'form_names',
+)
 
 
 def model_json_schema_to_fields(model: type[BaseModel]) -> list[FormField]:
+    """
+    Generate form fields for a pydantic model.
+
+    Fields are generated once per model and cached, see `model_fields_cache_info` and `model_fields_cache_clear`.
+    The returned list is a fresh copy, but the field objects in it are shared between calls, so must not be mutated.
+    """
+    return list(_model_json_schema_to_fields(model))
+
+
+@lru_cache(maxsize=256)
+def _model_json_schema_to_fields(model: type[BaseModel]) -> tuple[FormField, ...]:
     schema = _t.cast(JsonSchemaObject, model.model_json_schema())
     defs = schema.get('$defs', {})
-    return list(json_schema_obj_to_fields(schema, [], [], defs))
+    return tuple(json_schema_obj_to_fields(schema, [], [], defs, {}))
+
+
+def model_fields_cache_info() -> '_CacheInfo':
+    """
+    Statistics (`hits`, `misses`, `maxsize` and `currsize`) for the cache used by `model_json_schema_to_fields`.
+    """
+    return _model_json_schema_to_fields.cache_info()
+
+
+def model_fields_cache_clear() -> None:
+    """
+    Clear the cache used by `model_json_schema_to_fields`, e.g. after a model has been rebuilt with `model_rebuild()`.
+    """
+    _model_json_schema_to_fields.cache_clear()
 
 
 JsonSchemaInput: _ta.TypeAlias = (
@@ -131,6 +172,18 @@ JsonSchemaObject = _t.TypedDict(
 )
 
 
+class JsonSchemaDiscriminator(_t.TypedDict):
+    propertyName: str
+    mapping: dict[str, str]
+
+
+class JsonSchemaUnion(JsonSchemaBase, total=False):
+    oneOf: _ta.Required[list[JsonSchemaAny]]
+    discriminator: _ta.Required[JsonSchemaDiscriminator]
+    default: dict[str, _t.Any]
+    variants_url: str
+
+
 class JsonSchemaNull(JsonSchemaBase):
     type: _t.Literal['null']
 
@@ -146,32 +199,68 @@ class JsonSchemaAllOf(JsonSchemaBase):
 JsonSchemaRef = _t.TypedDict('JsonSchemaRef', {'$ref': str})
 
 SchemeLocation: _ta.TypeAlias = 'list[str | int]'
+# placeholder for the row index in the names of `FormFieldArray.item_fields`, replaced in the browser
+ARRAY_INDEX = '{index}'
+# fields generated for an object in `$defs`, with their locations relative to the object, or `None`
+# if they can't be copied
+FieldTemplates: _ta.TypeAlias = 'dict[str, list[tuple[SchemeLocation, FormField]] | None]'
 
 
 def json_schema_obj_to_fields(
-    schema: JsonSchemaObject, loc: SchemeLocation, title: list[str], defs: JsonSchemaDefs
+    schema: JsonSchemaObject,
+    loc: SchemeLocation,
+    title: list[str],
+    defs: JsonSchemaDefs,
+    templates: _t.Union[FieldTemplates, None] = None,
 ) -> _t.Iterable[FormField]:
     required = set(schema.get('required', []))
     if properties := schema.get('properties'):
         for key, value in properties.items():
-            yield from json_schema_any_to_fields(value, loc + [key], title, key in required, defs)
+            yield from json_schema_any_to_fields(value, loc + [key], title, key in required, defs, templates)
 
 
 def json_schema_any_to_fields(
-    schema: JsonSchemaAny, loc: SchemeLocation, title: list[str], required: bool, defs: JsonSchemaDefs
+    schema: JsonSchemaAny,
+    loc: SchemeLocation,
+    title: list[str],
+    required: bool,
+    defs: JsonSchemaDefs,
+    templates: _t.Union[FieldTemplates, None] = None,
 ) -> _t.Iterable[FormField]:
     dereferenced, required = deference_json_schema(schema, defs, required)
     title = title + [schema.get('title', dereferenced.get('title', loc_to_title(loc)))]
     description = schema.get('description', dereferenced.get('description'))
 
-    if schema_is_field(dereferenced):
+    if schema_is_union(dereferenced):
+        yield json_schema_union_to_field(dereferenced, loc, title, description, required, defs)
+    elif schema_is_field(dereferenced):
         yield json_schema_field_to_field(dereferenced, loc, title, description, required)
     elif schema_is_array(dereferenced):
-        yield from json_schema_array_to_fields(dereferenced, loc, title, description, required, defs)
+        yield from json_schema_array_to_fields(dereferenced, loc, title, description, required, defs, templates)
     else:
         assert schema_is_object(dereferenced), f'Unexpected schema type {dereferenced}'
 
-        yield from json_schema_obj_to_fields(dereferenced, loc, title, defs)
+        template = None
+        if templates is not None and (ref := schema_ref(schema)):
+            if ref not in templates:
+                from .forms import name_to_loc
+
+                # an object's fields only depend on its definition, so they're generated once for each definition,
+                # then copied with the location and title of each place the definition is used
+                template_fields = list(json_schema_obj_to_fields(dereferenced, [], [], defs, templates))
+                # arrays and unions name the fields they contain by location, so they can't be copied elsewhere
+                if any(isinstance(f, (FormFieldArray, FormFieldUnion)) for f in template_fields):
+                    templates[ref] = None
+                else:
+                    templates[ref] = [(name_to_loc(f.name), f) for f in template_fields]
+            template = templates[ref]
+
+        if template is not None:
+            for field_loc, field in template:
+                field_title = title + field.title if isinstance(field.title, list) else field.title
+                yield field.model_copy(update={'name': loc_to_name(loc + field_loc), 'title': field_title})
+        else:
+            yield from json_schema_obj_to_fields(dereferenced, loc, title, defs, templates)
 
 
 def json_schema_field_to_field(
@@ -217,6 +306,7 @@ def json_schema_array_to_fields(
     description: _t.Union[str, None],
     required: bool,
     defs: JsonSchemaDefs,
+    templates: _t.Union[FieldTemplates, None] = None,
 ) -> _t.Iterable[FormField]:
     items_schema = schema.get('items')
     if items_schema:
@@ -233,7 +323,7 @@ def json_schema_array_to_fields(
     if (min_items := schema.get('minItems')) and min_items == schema.get('maxItems'):
         if items := schema.get('prefixItems'):
             for i, item in enumerate(items):
-                fields = list(json_schema_any_to_fields(item, loc + [i], title, required, defs))
+                fields = list(json_schema_any_to_fields(item, loc + [i], title, required, defs, templates))
                 if any(not f.required for f in fields):
                     raise NotImplementedError(
                         'Tuples with optional fields are not yet supported, '
@@ -242,9 +332,141 @@ def json_schema_array_to_fields(
                 yield from fields
             return
 
+    if items_schema and schema_is_object(items_schema):
+        # variable length arrays of objects are sent as a single row of fields, rows are added in the browser,
+        # then `unflatten` turns the indexed names back into a list
+        if ARRAY_INDEX in loc:
+            raise NotImplementedError('Nested arrays of objects are not yet supported')
+        item_fields = json_schema_obj_to_fields(items_schema, loc + [ARRAY_INDEX], title, defs, templates)
+        yield FormFieldArray(
+            name=loc_to_name(loc),
+            title=title,
+            required=required,
+            description=description,
+            item_fields=[array_item_field(f) for f in item_fields],
+            min_items=schema.get('minItems'),
+            max_items=schema.get('maxItems'),
+        )
+        return
+
     raise NotImplementedError('Array fields are not fully supported, see https://github.com/pydantic/FastUI/pull/52')
 
 
+def array_item_name(name: str) -> str:
+    """
+    JSON encoded names would quote the `ARRAY_INDEX` placeholder, but the index must be an int when it's decoded.
+    """
+    return name.replace(f'"{ARRAY_INDEX}"', ARRAY_INDEX)
+
+
+def array_item_field(field: FormField) -> FormField:
+    """
+    Unquote the `ARRAY_INDEX` placeholder in the name of a field in an array row, and in the names of a union's
+    variant fields, which are also within the row.
+    """
+    update: dict[str, _t.Any] = {'name': array_item_name(field.name)}
+    if isinstance(field, FormFieldUnion) and field.variant_fields is not None:
+        update['variant_fields'] = {
+            variant: [array_item_field(f) for f in fields] for variant, fields in field.variant_fields.items()
+        }
+    return field.model_copy(update=update)
+
+
+def json_schema_union_to_field(
+    schema: JsonSchemaUnion,
+    loc: SchemeLocation,
+    title: list[str],
+    description: _t.Union[str, None],
+    required: bool,
+    defs: JsonSchemaDefs,
+) -> FormField:
+    """
+    Discriminated unions are rendered as a select for the discriminator, the fields of each variant are only
+    generated when it's selected, either by `model_union_variant_fields` if the schema has a `variants_url`,
+    or up front otherwise.
+    """
+    discriminator = schema['discriminator']
+    property_name = discriminator['propertyName']
+    variants: dict[str, JsonSchemaObject] = {}
+    options: list[SelectOption] = []
+    for value, ref in discriminator['mapping'].items():
+        variant, _ = deference_json_schema({'$ref': ref}, defs, required)
+        assert schema_is_object(variant), f'Unexpected union variant {variant}'
+        properties = variant.get('properties', {})
+        variants[value] = {**variant, 'properties': {k: v for k, v in properties.items() if k != property_name}}
+        options.append(SelectOption(value=value, label=variant.get('title') or as_title(value)))
+
+    def load_variant(variant_loc: SchemeLocation, variant_title: _t.Any, variant: str) -> list[FormField]:
+        try:
+            variant_schema = variants[variant]
+        except KeyError:
+            raise ValueError(f'Unknown variant {variant!r}, expected one of {list(variants)}') from None
+        fields = list(json_schema_obj_to_fields(variant_schema, variant_loc, variant_title, defs, {}))
+        if any(isinstance(f, FormFieldUnion) for f in fields):
+            raise NotImplementedError('Unions nested within union variants are not yet supported')
+        return fields
+
+    default = schema.get('default')
+    variants_url = schema.get('variants_url')
+    field = FormFieldUnion(
+        name=loc_to_name(loc + [property_name]),
+        title=title,
+        required=required,
+        description=description,
+        options=options,
+        initial=default.get(property_name) if isinstance(default, dict) else None,
+        variants_url=variants_url,
+        variant_fields=None if variants_url else {v: load_variant(loc, title, v) for v in variants},
+    )
+    field._load_variant = load_variant
+    return field
+
+
+def model_union_variant_fields(model: type[BaseModel], name: str, variant: str) -> list[FormField]:
+    """
+    Generate the fields of one variant of a discriminated union in a model, this should be returned by the endpoint
+    at the union's `variants_url`.
+
+    Args:
+        model: The model the form is generated from.
+        name: The name of the union's `FormFieldUnion`, sent as the `name` query parameter.
+        variant: The discriminator value of the selected variant, sent as the `variant` query parameter.
+
+    Returns:
+        The variant's fields, named by their location within the model.
+    """
+    return list(_model_union_variant_fields(model, name, variant))
+
+
+@lru_cache(maxsize=256)
+def _model_union_variant_fields(model: type[BaseModel], name: str, variant: str) -> tuple[FormField, ...]:
+    from .forms import name_to_loc
+
+    loc = name_to_loc(name)
+    field = find_union_field(model_json_schema_to_fields(model), name, loc)
+    if field is None or field._load_variant is None:
+        raise ValueError(f'{model.__name__} has no union field {name!r}')
+    return tuple(field._load_variant(loc[:-1], field.title, variant))
+
+
+def find_union_field(fields: _t.Iterable[FormField], name: str, loc: SchemeLocation) -> _t.Union[FormFieldUnion, None]:
+    """
+    Find a union field by name, including in the row template of arrays, where the name has an index.
+    """
+    for field in fields:
+        if isinstance(field, FormFieldUnion) and field.name == name:
+            return field
+        elif isinstance(field, FormFieldArray):
+            from .forms import name_to_loc
+
+            array_loc = name_to_loc(field.name)
+            i = len(array_loc)
+            if loc[:i] == array_loc and len(loc) > i and isinstance(loc[i], int):
+                item_loc = [*array_loc, ARRAY_INDEX, *loc[i + 1 :]]
+                return find_union_field(field.item_fields, array_item_name(loc_to_name(item_loc)), item_loc)
+    return None
+
+
 def special_string_field(
     schema: JsonSchemaConcrete,
     name: str,
@@ -306,14 +528,102 @@ def loc_to_name(loc: SchemeLocation) -> str:
     Convert a loc to a string if any item contains a '.' or the first item starts with '[' then encode with JSON,
     otherwise join with '.'.
 
-    The sister method `name_to_loc` is in `form_extra.py`.
+    The name is recorded in `form_names`, so it can be decoded without parsing when the form is submitted.
+
+    The sister method `name_to_loc` is in `forms.py`.
     """
+    loc_key = tuple(loc)
+    if (name := form_names.name(loc_key)) is not None:
+        return name
+
     if any(isinstance(v, str) and '.' in v for v in loc):
-        return json.dumps(loc)
+        name = json.dumps(loc)
     elif isinstance(loc[0], str) and loc[0].startswith('['):
-        return json.dumps(loc)
+        name = json.dumps(loc)
     else:
-        return '.'.join(str(v) for v in loc)
+        name = '.'.join(str(v) for v in loc)
+    form_names.add(name, loc_key)
+    return name
+
+
+class FormNameRegistry:
+    """
+    Bounded LRU mapping between form field names and their locations, in both directions.
+
+    Filled by `loc_to_name` as forms are rendered, and read by `forms.name_to_loc` as they're submitted. Names
+    submitted which aren't in the registry are parsed without being added, so clients can't change rendered names.
+    """
+
+    def __init__(self, maxsize: int = 4096):
+        self.maxsize = maxsize
+        self._locs: OrderedDict[str, tuple[_t.Union[str, int], ...]] = OrderedDict()
+        self._names: dict[tuple[_t.Union[str, int], ...], str] = {}
+        self._lock = threading.Lock()
+
+    def loc(self, name: str) -> _t.Union[tuple[_t.Union[str, int], ...], None]:
+        """
+        Get the location of a form field by name, `None` if it isn't known.
+        """
+        # reads don't take the lock, single dict operations are atomic, and an entry evicted by another thread
+        # between them is simply a miss
+        loc = self._locs.get(name)
+        if loc is not None:
+            try:
+                self._locs.move_to_end(name)
+            except KeyError:
+                return None
+        return loc
+
+    def name(self, loc: tuple[_t.Union[str, int], ...]) -> _t.Union[str, None]:
+        """
+        Get the name of a form field by location, `None` if it isn't known.
+        """
+        name = self._names.get(loc)
+        if name is not None:
+            try:
+                self._locs.move_to_end(name)
+            except KeyError:
+                return None
+        return name
+
+    def add(self, name: str, loc: tuple[_t.Union[str, int], ...]) -> None:
+        """
+        Record the name of the form field at `loc`, evicting the least recently used entry if the registry is full.
+        """
+        with self._lock:
+            self._locs[name] = loc
+            self._locs.move_to_end(name)
+            self._names[loc] = name
+            while len(self._locs) > self.maxsize:
+                old_name, old_loc = self._locs.popitem(last=False)
+                if self._names.get(old_loc) == old_name:
+                    del self._names[old_loc]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._locs.clear()
+            self._names.clear()
+
+    def __len__(self) -> int:
+        return len(self._locs)
+
+
+form_names = FormNameRegistry()
+"""Registry of rendered form field names, shared between rendering and parsing forms."""
+
+
+def schema_ref(schema: JsonSchemaAny) -> _t.Union[str, None]:
+    """
+    Get the `$ref` a schema points to, either directly or via `allOf` or an optional `anyOf`.
+    """
+    if ref := schema.get('$ref'):
+        return ref
+    elif (all_of := schema.get('allOf')) and len(all_of) == 1:
+        return schema_ref(all_of[0])
+    elif (any_of := schema.get('anyOf')) and len(any_of) == 2:
+        return next((r for s in any_of if (r := schema_ref(s))), None)
+    else:
+        return None
 
 
 def deference_json_schema(
@@ -388,6 +698,13 @@ def input_html_type(schema: JsonSchemaField) -> InputHtmlType:
         raise ValueError(f'Unknown schema: {schema}') from e
 
 
+def schema_is_union(schema: JsonSchemaConcrete) -> _ta.TypeGuard[JsonSchemaUnion]:
+    """
+    Determine if a schema is a discriminated union `JsonSchemaUnion`
+    """
+    return 'discriminator' in schema and 'oneOf' in schema
+
+
 def schema_is_field(schema: JsonSchemaConcrete) -> _ta.TypeGuard[JsonSchemaField]:
     """
     Determine if a schema is a field `JsonSchemaField`
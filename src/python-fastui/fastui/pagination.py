@@ -0,0 +1,166 @@
+"""
+Helpers for server side pagination of data displayed with `Table` and `Pagination`.
+
+Only the rows for the requested page are materialised, and the total is only counted when it can't be
+inferred from the page itself.
+"""
+import typing as _t
+from dataclasses import dataclass
+from itertools import islice
+
+import pydantic
+
+from . import components as c
+
+__all__ = 'Paginated', 'paginate', 'paginate_async'
+
+T = _t.TypeVar('T', bound=pydantic.BaseModel)
+
+
+@dataclass
+class Paginated(_t.Generic[T]):
+    """
+    A single page of data, as returned by `paginate` and `paginate_async`.
+    """
+
+    rows: list[T]
+    """The rows on this page."""
+    page: int
+    """The current page number, starting at 1."""
+    page_size: int
+    """The maximum number of rows per page."""
+    total: int
+    """The total number of rows, or an estimate of it if `total_is_estimate` is `True`."""
+    total_is_estimate: bool = False
+    """Whether `total` is an estimate rather than an exact count."""
+
+    def table(self, **kwargs: _t.Any) -> c.Table:
+        """
+        Create a `Table` displaying the rows on this page, `kwargs` are passed to `Table`.
+        """
+        return c.Table(data=self.rows, **kwargs)
+
+    def pagination(self, **kwargs: _t.Any) -> c.Pagination:
+        """
+        Create a `Pagination` component for this page, `kwargs` are passed to `Pagination`.
+        """
+        return c.Pagination(
+            page=self.page,
+            page_size=self.page_size,
+            total=self.total,
+            total_is_estimate=self.total_is_estimate,
+            **kwargs,
+        )
+
+
+def paginate(
+    source: _t.Iterable[T],
+    *,
+    page: int,
+    page_size: int,
+    total: _t.Union[int, _t.Callable[[], int], None] = None,
+    estimate: _t.Union[_t.Callable[[], int], None] = None,
+) -> Paginated[T]:
+    """
+    Get a single page of rows from `source`.
+
+    Arguments:
+        source: a sequence of models, which is sliced, or any other iterable of models,
+            which is consumed only up to the end of the page.
+        page: the page number to get, starting at 1.
+        page_size: the number of rows per page.
+        total: the total number of rows, or a function to count them which is only called if the total can't be
+            inferred from the page, by default `len(source)` is used for sequences.
+        estimate: a function returning a cheap estimate of the total number of rows,
+            used instead of counting if it's set.
+
+    Returns:
+        The rows for the page, along with the total.
+    """
+    page = max(page, 1)
+    start = (page - 1) * page_size
+    # get one extra row so we know if there are more pages
+    if isinstance(source, _t.Sequence):
+        rows = list(source[start : start + page_size + 1])
+    else:
+        iterator = iter(source)
+        # count the rows before the page, so the total is known if the page is past the end
+        skipped = sum(1 for _ in islice(iterator, start))
+        rows = list(islice(iterator, page_size + 1))
+        if not rows:
+            return Paginated(rows, page, page_size, skipped)
+
+    if _is_last_page(rows, start, page_size):
+        # we know the total without counting
+        return Paginated(rows, page, page_size, start + len(rows))
+
+    rows = rows[:page_size]
+    if isinstance(total, int):
+        return Paginated(rows, page, page_size, total)
+    elif estimate is not None:
+        return _estimated(rows, page, page_size, estimate())
+    elif total is not None:
+        return Paginated(rows, page, page_size, total())
+    elif isinstance(source, _t.Sized):
+        return Paginated(rows, page, page_size, len(source))
+    else:
+        # we can't count an iterator without consuming it
+        return _estimated(rows, page, page_size, None)
+
+
+async def paginate_async(
+    fetch: _t.Callable[[int, int], _t.Awaitable[_t.Iterable[T]]],
+    *,
+    page: int,
+    page_size: int,
+    count: _t.Union[_t.Callable[[], _t.Awaitable[int]], None] = None,
+    estimate: _t.Union[_t.Callable[[], _t.Awaitable[int]], None] = None,
+) -> Paginated[T]:
+    """
+    Get a single page of rows using async functions, e.g. to query a database.
+
+    Arguments:
+        fetch: an async function called with `(offset, limit)` which returns at most `limit` rows.
+        page: the page number to get, starting at 1.
+        page_size: the number of rows per page.
+        count: an async function to count the total number of rows,
+            only called if the total can't be inferred from the page.
+        estimate: an async function returning a cheap estimate of the total number of rows,
+            used instead of `count` if it's set.
+
+    Returns:
+        The rows for the page, along with the total.
+    """
+    page = max(page, 1)
+    start = (page - 1) * page_size
+    rows = list(await fetch(start, page_size + 1))
+
+    if _is_last_page(rows, start, page_size):
+        return Paginated(rows, page, page_size, start + len(rows))
+
+    rows = rows[:page_size]
+    if estimate is not None:
+        return _estimated(rows, page, page_size, await estimate())
+    elif count is not None:
+        return Paginated(rows, page, page_size, await count())
+    else:
+        return _estimated(rows, page, page_size, None)
+
+
+def _is_last_page(rows: list[_t.Any], start: int, page_size: int) -> bool:
+    # a page past the end is empty, but doesn't tell us the total
+    return len(rows) <= page_size and (bool(rows) or start == 0)
+
+
+def _estimated(rows: list[T], page: int, page_size: int, estimate: _t.Union[int, None]) -> Paginated[T]:
+    if rows:
+        # there's at least one row after this page, so the total must allow for a next page
+        total = page * page_size + 1
+        if estimate is not None:
+            total = max(estimate, total)
+    else:
+        # this page is past the end, so there are at most `start` rows
+        total = (page - 1) * page_size
+        if estimate is not None:
+            total = min(estimate, total)
+    return Paginated(rows, page, page_size, total, total_is_estimate=True)
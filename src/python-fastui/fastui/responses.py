@@ -0,0 +1,77 @@
+import typing as _t
+
+import pydantic
+
+from .components import AnyComponent
+
+try:
+    from starlette.responses import StreamingResponse
+except ImportError as _e:
+    raise ImportError(
+        'fastui.responses requires fastapi to be installed, install with `pip install fastui[fastapi]`'
+    ) from _e
+
+__all__ = ('stream_components',)
+
+_component_adapter: pydantic.TypeAdapter[AnyComponent] = pydantic.TypeAdapter(AnyComponent)
+
+
+def stream_components(
+    components: _t.Union[_t.Iterable[AnyComponent], _t.AsyncIterable[AnyComponent]],
+    *,
+    status_code: int = 200,
+    headers: _t.Union[_t.Mapping[str, str], None] = None,
+    chunk_size: int = 16_384,
+) -> StreamingResponse:
+    """
+    Create a response which streams `components` as a JSON array, serializing each component as it's produced.
+
+    Use this instead of returning a list of components with `response_model=FastUI` when a page contains a very large
+    number of components, memory use and time to first byte then don't grow with the size of the page.
+
+    Components are not validated, they should be constructed in Python.
+
+    Arguments:
+        components: an iterable or async iterable of components, sync iterables are consumed in a thread pool.
+        status_code: HTTP status code of the response.
+        headers: extra headers for the response.
+        chunk_size: serialized components are buffered until they reach roughly this many bytes before being sent.
+
+    Returns:
+        A `StreamingResponse` with the `application/json` content type.
+    """
+    if isinstance(components, _t.AsyncIterable):
+        content: _t.Union[_t.Iterator[bytes], _t.AsyncIterator[bytes]] = _stream_async(components, chunk_size)
+    else:
+        content = _stream_sync(components, chunk_size)
+    return StreamingResponse(content, status_code=status_code, headers=headers, media_type='application/json')
+
+
+def _stream_sync(components: _t.Iterable[AnyComponent], chunk_size: int) -> _t.Iterator[bytes]:
+    chunk = bytearray(b'[')
+    sep = b''
+    for component in components:
+        chunk += sep + _dump_component(component)
+        sep = b','
+        if len(chunk) >= chunk_size:
+            yield bytes(chunk)
+            chunk.clear()
+    chunk += b']'
+    yield bytes(chunk)
+
+
+async def _stream_async(components: _t.AsyncIterable[AnyComponent], chunk_size: int) -> _t.AsyncIterator[bytes]:
+    chunk = bytearray(b'[')
+    sep = b''
+    async for component in components:
+        chunk += sep + _dump_component(component)
+        sep = b','
+        if len(chunk) >= chunk_size:
+            yield bytes(chunk)
+            chunk.clear()
+    chunk += b']'
+    yield bytes(chunk)
+
+
+def _dump_component(component: AnyComponent) -> bytes:
+    return _component_adapter.dump_json(component, by_alias=True, exclude_none=True)
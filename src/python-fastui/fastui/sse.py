@@ -0,0 +1,322 @@
+"""
+Helpers for server sent events (SSE) consumed by `ServerLoad(sse=True)`.
+
+The data of each event is either a JSON list of components, which replaces everything `ServerLoad` has rendered,
+or an object of the form `{"patch": [...]}` holding operations applied to the components already rendered.
+
+An operation's `path` locates a value within the rendered list of components, e.g. `[0, "data"]` is the `data` of
+the first component.
+"""
+import asyncio
+import typing as _t
+
+import pydantic
+import pydantic_core
+import typing_extensions as _te
+
+from . import components as _c
+
+if _t.TYPE_CHECKING:
+    from starlette.responses import StreamingResponse
+
+__all__ = (
+    'PatchOp',
+    'Path',
+    'Differ',
+    'diff',
+    'sse_response',
+    'append_rows',
+    'append_components',
+    'append_text',
+    'components_event',
+    'patch_event',
+)
+
+Path = _t.Sequence[_t.Union[int, str]]
+_component_list_adapter = pydantic.TypeAdapter(list[_c.AnyComponent])
+
+
+class PatchOp(_te.TypedDict):
+    """
+    An operation applied to the rendered components by the frontend.
+
+    * `append` extends the list or string at `path` with `value`
+    * `replace` sets the value at `path` to `value`
+    * `remove` deletes the key at `path` from its object
+    """
+
+    op: _t.Literal['append', 'replace', 'remove']
+    path: list[_t.Union[int, str]]
+    value: _te.NotRequired[_t.Any]
+
+
+ComponentsSource = _t.Union[
+    _t.AsyncIterable[_t.Sequence[_c.AnyComponent]], _t.Callable[[int], _t.AsyncIterable[_t.Sequence[_c.AnyComponent]]]
+]
+
+
+def sse_response(
+    source: ComponentsSource,
+    *,
+    last_event_id: _t.Union[str, None] = None,
+    heartbeat: _t.Union[float, None] = 15,
+    retry: _t.Union[int, None] = None,
+) -> 'StreamingResponse':
+    """
+    Create an event stream response for `ServerLoad(sse=True)` from an async iterable of component lists.
+
+    Each event has an id counting the component lists produced by `source`, and after the first event only
+    patches against the components last sent are sent, see `Differ`.
+
+    If the client is slower than `source`, component lists which haven't been sent yet are replaced by newer ones,
+    so the client always catches up with the latest state rather than the stream building up a backlog.
+
+    Usage:
+
+    ```py
+    @app.get('/api/stream')
+    async def stream(last_event_id: Annotated[str | None, Header()] = None) -> StreamingResponse:
+        return sse_response(generate_components(), last_event_id=last_event_id)
+    ```
+
+    Arguments:
+        source: an async iterable of component lists, or a function which takes the number of component lists
+            already sent to the client and returns one, so a resumed stream can start where it left off.
+        last_event_id: the `Last-Event-ID` header sent when the client reconnects, if it's set, component lists up
+            to that id aren't sent again, and the first event sent contains all components.
+        heartbeat: seconds without an event after which a comment is sent to keep the connection open,
+            `None` to disable.
+        retry: milliseconds the client should wait before reconnecting, if set.
+
+    Returns:
+        A `StreamingResponse` with the `text/event-stream` content type.
+    """
+    try:
+        from starlette.responses import StreamingResponse
+    except ImportError as e:
+        raise ImportError(
+            'fastui.sse.sse_response requires fastapi to be installed, install with `pip install fastui[fastapi]`'
+        ) from e
+
+    start = int(last_event_id) if last_event_id and last_event_id.isdigit() else 0
+    if callable(source):
+        components_iter, skip = source(start), 0
+    else:
+        components_iter, skip = source, start
+    return StreamingResponse(
+        _event_stream(components_iter, start, skip, heartbeat, retry),
+        media_type='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'},
+    )
+
+
+async def _event_stream(
+    source: _t.AsyncIterable[_t.Sequence[_c.AnyComponent]],
+    start: int,
+    skip: int,
+    heartbeat: _t.Union[float, None],
+    retry: _t.Union[int, None],
+) -> _t.AsyncIterator[str]:
+    # `source` is consumed by a separate task so heartbeats can be sent while waiting for it, and so only the latest
+    # component list is kept when the client can't keep up
+    pending: _t.Union[tuple[int, _t.Sequence[_c.AnyComponent]], None] = None
+    done = False
+    ready = asyncio.Event()
+
+    async def produce() -> None:
+        nonlocal pending, done
+        try:
+            event_id = start - skip
+            async for components in source:
+                event_id += 1
+                if event_id > start:
+                    pending = event_id, components
+                    ready.set()
+        finally:
+            done = True
+            ready.set()
+
+    task = asyncio.create_task(produce())
+    try:
+        if retry is not None:
+            yield f'retry: {retry}\n\n'
+        differ = Differ()
+        while True:
+            try:
+                await asyncio.wait_for(ready.wait(), heartbeat)
+            except asyncio.TimeoutError:
+                yield ': ping\n\n'
+                continue
+            ready.clear()
+            if pending is not None:
+                (event_id, components), pending = pending, None
+                if event := differ.event(components):
+                    yield f'id: {event_id}\n{event}'
+            if done and pending is None:
+                break
+        # raise any error from `source`
+        await task
+    finally:
+        task.cancel()
+
+
+class Differ:
+    """
+    Creates events for a stream of component lists, sending only what changed since the previous event.
+
+    The first event is the full list of components, later events are patches against the last list sent, e.g.
+    when the text of a `Markdown` component grows, only the new text is sent.
+
+    Only the bytes sent are reduced: each event still serializes and diffs the whole list of components, so the
+    server's work for a growing text is quadratic in its length. If you already know what was added, e.g. the
+    tokens of an AI response, send it with `patch_event(append_text(...))` instead, which is linear.
+
+    Usage:
+
+    ```py
+    async def generator():
+        differ = Differ()
+        async for text in ai_response():
+            if event := differ.event([c.Markdown(text=text)]):
+                yield event
+    ```
+    """
+
+    def __init__(self):
+        self._last: _t.Union[list[_t.Any], None] = None
+
+    def event(self, components: _t.Sequence[_c.AnyComponent]) -> _t.Union[str, None]:
+        """
+        Create the event to send `components`, `None` if nothing has changed since the last event.
+        """
+        data = _component_list_adapter.dump_python(list(components), mode='json', by_alias=True, exclude_none=True)
+        last, self._last = self._last, data
+        if last is None:
+            return _event(data)
+
+        ops = diff(last, data)
+        if not ops:
+            return None
+        elif not ops[0]['path']:
+            # the whole list was replaced
+            return _event(data)
+        else:
+            return _event({'patch': ops})
+
+    def reset(self) -> None:
+        """
+        Forget the last list of components sent, so the next event contains all components, e.g. after reconnecting.
+        """
+        self._last = None
+
+
+def diff(old: _t.Any, new: _t.Any, path: _t.Union[list[_t.Union[int, str]], None] = None) -> list[PatchOp]:
+    """
+    Calculate the operations to turn JSON data `old` into `new`.
+
+    Lists and strings which grow at the end produce `append` operations, other changes produce `replace` and
+    `remove` operations.
+    """
+    ops: list[PatchOp] = []
+    _diff(old, new, path or [], ops)
+    return ops
+
+
+def _diff(old: _t.Any, new: _t.Any, path: list[_t.Union[int, str]], ops: list[PatchOp]) -> None:
+    if type(old) is not type(new):
+        ops.append(PatchOp(op='replace', path=path, value=new))
+    elif isinstance(new, dict):
+        if old.get('type') != new.get('type'):
+            # a different component, there's no point diffing its fields
+            ops.append(PatchOp(op='replace', path=path, value=new))
+            return
+        for key, value in new.items():
+            if key in old:
+                _diff(old[key], value, [*path, key], ops)
+            else:
+                ops.append(PatchOp(op='replace', path=[*path, key], value=value))
+        ops.extend(PatchOp(op='remove', path=[*path, key]) for key in old.keys() - new.keys())
+    elif isinstance(new, list):
+        if len(new) < len(old):
+            ops.append(PatchOp(op='replace', path=path, value=new))
+            return
+        for index, (old_item, new_item) in enumerate(zip(old, new)):
+            _diff(old_item, new_item, [*path, index], ops)
+        if len(new) > len(old):
+            ops.append(PatchOp(op='append', path=path, value=new[len(old) :]))
+    elif isinstance(new, str) and len(new) > len(old) and new.startswith(old):
+        ops.append(PatchOp(op='append', path=path, value=new[len(old) :]))
+    elif old != new:
+        ops.append(PatchOp(op='replace', path=path, value=new))
+
+
+def append_rows(path: Path, table: _c.Table, rows: _t.Sequence[pydantic.BaseModel]) -> list[PatchOp]:
+    """
+    Create the operations to append `rows` to a `Table` which has already been sent.
+
+    Rows are serialized exactly as `table` would serialize them, so only displayed fields are sent, and with
+    `columnar=True` one operation is returned per column.
+
+    Arguments:
+        path: the location of the table, e.g. `[1]` if it's the second component in the list.
+        table: the table the rows are appended to, its `data` is not used.
+        rows: the new rows.
+
+    Returns:
+        The operations to pass to `patch_event`.
+    """
+    data = table.model_copy(update={'data': rows}).model_dump(mode='json', by_alias=True, exclude_none=True)['data']
+    if isinstance(data, dict):
+        return [PatchOp(op='append', path=[*path, 'data', field], value=values) for field, values in data.items()]
+    else:
+        return [PatchOp(op='append', path=[*path, 'data'], value=data)]
+
+
+def append_components(path: Path, components: _t.Sequence[_c.AnyComponent]) -> list[PatchOp]:
+    """
+    Create the operation to append `components` to the children of a component which has already been sent.
+
+    Arguments:
+        path: the location of the component's children, e.g. `[0, "components"]` for a `Div` which is
+            the first component in the list.
+        components: the new components.
+
+    Returns:
+        The operations to pass to `patch_event`.
+    """
+    value = _component_list_adapter.dump_python(list(components), mode='json', by_alias=True, exclude_none=True)
+    return [PatchOp(op='append', path=list(path), value=value)]
+
+
+def append_text(path: Path, text: str) -> list[PatchOp]:
+    """
+    Create the operation to append `text` to the text of a `Markdown`, `Text` or `Paragraph` component which has
+    already been sent, without serializing the text sent before.
+
+    Arguments:
+        path: the location of the component, e.g. `[0]` if it's the first component in the list.
+        text: the new text.
+
+    Returns:
+        The operations to pass to `patch_event`.
+    """
+    return [PatchOp(op='append', path=[*path, 'text'], value=text)]
+
+
+def components_event(components: _t.Sequence[_c.AnyComponent]) -> str:
+    """
+    Format an event which replaces all components rendered by `ServerLoad`.
+    """
+    data = _component_list_adapter.dump_json(list(components), by_alias=True, exclude_none=True).decode()
+    return f'data: {data}\n\n'
+
+
+def patch_event(ops: _t.Sequence[PatchOp]) -> str:
+    """
+    Format an event which applies `ops` to the components rendered by `ServerLoad`.
+    """
+    return _event({'patch': ops})
+
+
+def _event(data: _t.Any) -> str:
+    return f'data: {pydantic_core.to_json(data).decode()}\n\n'
@@ -1,11 +1,23 @@
-from datetime import datetime
+import asyncio
+import time
+from datetime import timedelta
 from typing import Optional
 
 import httpx
 import pytest
 from fastapi import FastAPI
 from fastui.auth import AuthError, GitHubAuthProvider, GitHubEmail
-from fastui.auth.github import EXCHANGE_CACHE
+from fastui.auth.github import (
+    EXCHANGE_CACHE,
+    IN_FLIGHT,
+    PROFILE_CACHE,
+    ExchangeCache,
+    FileExchangeCache,
+    GitHubExchange,
+    HMACStateProvider,
+    SingleFlight,
+    StateProvider,
+)
 from pydantic import SecretStr
 
 
@@ -24,6 +36,8 @@ def fake_github_app(github_requests: list[str]) -> FastAPI:
         if redirect_uri:
             r += f' redirect_uri={redirect_uri}'
         github_requests.append(r)
+        # yield to other tasks like a real request would
+        await asyncio.sleep(0)
         assert client_id == '1234'
         assert client_secret == 'secret'
         if code == 'good_user':
@@ -38,6 +52,7 @@ def fake_github_app(github_requests: list[str]) -> FastAPI:
     @app.get('/user')
     async def user():
         github_requests.append('/user')
+        await asyncio.sleep(0)
         return {
             'login': 'test_user',
             'name': 'Test User',
@@ -59,6 +74,7 @@ def fake_github_app(github_requests: list[str]) -> FastAPI:
     @app.get('/user/emails')
     async def user_emails():
         github_requests.append('/user/emails')
+        await asyncio.sleep(0)
         return [
             {'email': 'foo@example.com', 'primary': False, 'verified': True, 'visibility': None},
             {'email': 'bar@example.com', 'primary': True, 'verified': True, 'visibility': 'public'},
@@ -213,14 +229,144 @@ async def test_exchange_cached_purge(fake_github_app: FastAPI, httpx_client: htt
     await github_auth_provider.exchange_code('good')
     assert len(EXCHANGE_CACHE) == 1
 
-    # manually add an old entry
-    EXCHANGE_CACHE._data['old'] = (datetime(2020, 1, 1), 'old_token')
+    # manually add an expired entry, entries are expired from the front of the cache
+    EXCHANGE_CACHE._data['old'] = (time.monotonic() - 1, 'old_token')
+    EXCHANGE_CACHE._data.move_to_end('old', last=False)
     assert len(EXCHANGE_CACHE) == 2
 
     await github_auth_provider.exchange_code('good')
     assert len(EXCHANGE_CACHE) == 1
 
 
+async def test_exchange_cache_max_size():
+    cache = ExchangeCache(max_size=2)
+    exchange = GitHubExchange(access_token='token', token_type='bearer', scope=[])
+    for key in 'abc':
+        await cache.set(key, exchange, timedelta(seconds=10))
+    assert len(cache) == 2
+    assert await cache.get('a') is None
+    assert await cache.get('c') == exchange
+
+    await cache.set('d', exchange, timedelta(seconds=-1))
+    assert await cache.get('d') is None
+
+
+async def test_file_exchange_cache(tmp_path):
+    cache = FileExchangeCache(tmp_path)
+    exchange = GitHubExchange(access_token='token', token_type='bearer', scope=['user'])
+    assert await cache.get('code:state') is None
+    await cache.set('code:state', exchange, timedelta(seconds=10))
+    # another process sees the same entry
+    assert await FileExchangeCache(tmp_path).get('code:state') == exchange
+
+    await cache.set('expired', exchange, timedelta(seconds=-1))
+    assert await cache.get('expired') is None
+    assert len(list(tmp_path.iterdir())) == 1
+
+
+async def test_file_exchange_cache_purge_on_get(tmp_path):
+    directory = tmp_path / 'cache'
+    writer = FileExchangeCache(directory)
+    assert directory.stat().st_mode & 0o777 == 0o700
+    exchange = GitHubExchange(access_token='token', token_type='bearer', scope=['user'])
+    # the first write purges, so the next writes aren't purged until `purge_interval` has passed
+    await writer.set('fresh', exchange, timedelta(seconds=10))
+    await writer.set('a', exchange, timedelta(seconds=-1))
+    await writer.set('b', exchange, timedelta(seconds=-1))
+    assert len(list(directory.iterdir())) == 3
+
+    # expired files are removed by reads too, not only by later writes
+    assert await FileExchangeCache(directory).get('other') is None
+    assert len(list(directory.iterdir())) == 1
+
+
+async def test_exchange_file_cache_shared(
+    fake_github_app: FastAPI, httpx_client: httpx.AsyncClient, github_requests: list[str], tmp_path
+):
+    providers = [
+        GitHubAuthProvider(
+            httpx_client=httpx_client,
+            github_client_id='1234',
+            github_client_secret=SecretStr('secret'),
+            state_provider=False,
+            exchange_cache=FileExchangeCache(tmp_path),
+        )
+        for _ in range(2)
+    ]
+    for provider in providers:
+        exchange = await provider.exchange_code('good')
+        assert exchange.access_token == 'good_token'
+    assert github_requests == ['/login/oauth/access_token code=good']
+
+
+async def test_exchange_concurrent(github_auth_provider: GitHubAuthProvider, github_requests: list[str]):
+    exchanges = await asyncio.gather(*[github_auth_provider.exchange_code('good') for _ in range(3)])
+    assert [e.access_token for e in exchanges] == ['good_token'] * 3
+    assert github_requests == ['/login/oauth/access_token code=good']
+    assert len(IN_FLIGHT) == 0
+
+
+async def test_single_flight_leader_cancelled():
+    single_flight = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def call() -> str:
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return 'result'
+
+    leader = asyncio.create_task(single_flight.run('key', call))
+    follower = asyncio.create_task(single_flight.run('key', call))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    release.set()
+
+    assert await follower == 'result'
+    with pytest.raises(asyncio.CancelledError):
+        await leader
+    assert calls == 1
+    assert len(single_flight) == 0
+
+
+async def test_single_flight_all_cancelled():
+    single_flight = SingleFlight()
+    cancelled = asyncio.Event()
+
+    async def call() -> str:
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+        return 'result'
+
+    task = asyncio.create_task(single_flight.run('key', call))
+    await asyncio.sleep(0)
+    task.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert len(single_flight) == 0
+
+
+async def test_exchange_concurrent_error(github_auth_provider: GitHubAuthProvider, github_requests: list[str]):
+    results = await asyncio.gather(
+        *[github_auth_provider.exchange_code('bad_expected') for _ in range(2)], return_exceptions=True
+    )
+    assert [str(r) for r in results] == ['Invalid GitHub verification code'] * 2
+    assert github_requests == ['/login/oauth/access_token code=bad_expected']
+
+
+async def test_get_github_user_concurrent(github_auth_provider: GitHubAuthProvider, github_requests: list[str]):
+    exchange = GitHubExchange(access_token='good_token', token_type='bearer', scope=[])
+    users = await asyncio.gather(*[github_auth_provider.get_github_user(exchange) for _ in range(2)])
+    emails = await asyncio.gather(*[github_auth_provider.get_github_user_emails(exchange) for _ in range(2)])
+    assert [u.login for u in users] == ['test_user'] * 2
+    assert emails[0] == emails[1] and emails[0] is not emails[1]
+    assert github_requests == ['/user', '/user/emails']
+
+
 async def test_exchange_redirect_url(
     fake_github_app: FastAPI, httpx_client: httpx.AsyncClient, github_requests: list[str]
 ):
@@ -263,6 +409,109 @@ async def test_get_github_user_emails(github_auth_provider: GitHubAuthProvider,
     assert github_requests == ['/login/oauth/access_token code=good', '/user/emails']
 
 
+async def test_get_github_identity(github_auth_provider: GitHubAuthProvider, github_requests: list[str]):
+    exchange = GitHubExchange(access_token='good_token', token_type='bearer', scope=[])
+    user, emails = await github_auth_provider.get_github_identity(exchange)
+    assert user.login == 'test_user'
+    assert [e.email for e in emails] == ['foo@example.com', 'bar@example.com']
+    assert sorted(github_requests) == ['/user', '/user/emails']
+
+
+async def test_profile_cache_etag(fake_github_app: FastAPI):
+    requests: list[tuple[str, Optional[str]]] = []
+    asgi_transport = httpx.ASGITransport(app=fake_github_app)
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        if_none_match = request.headers.get('if-none-match')
+        requests.append((request.url.path, if_none_match))
+        if if_none_match == '"v1"':
+            return httpx.Response(304)
+        response = await asgi_transport.handle_async_request(request)
+        await response.aread()
+        return httpx.Response(200, content=response.content, headers={'etag': '"v1"'})
+
+    PROFILE_CACHE.clear()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        provider = GitHubAuthProvider(
+            httpx_client=client,
+            github_client_id='1234',
+            github_client_secret=SecretStr('secret'),
+            state_provider=False,
+            profile_cache_age=timedelta(seconds=30),
+        )
+        exchange = GitHubExchange(access_token='good_token', token_type='bearer', scope=[])
+        user, emails = await provider.get_github_identity(exchange)
+        assert sorted(requests) == [('/user', None), ('/user/emails', None)]
+
+        # fresh entries are used without a request
+        assert await provider.get_github_identity(exchange) == (user, emails)
+        assert len(requests) == 2
+
+        # expired entries are revalidated with their ETag
+        for key, (_, etag, value) in list(PROFILE_CACHE._data.items()):
+            PROFILE_CACHE._data[key] = (time.monotonic() - 1, etag, value)
+        assert await provider.get_github_identity(exchange) == (user, emails)
+        assert sorted(requests[2:]) == [('/user', '"v1"'), ('/user/emails', '"v1"')]
+        assert await provider.get_github_user(exchange) is user
+        assert len(requests) == 4
+
+
+async def test_hmac_state_provider():
+    provider = HMACStateProvider(SecretStr('secret'))
+    state = await provider.new_state()
+    assert len(state) == 44
+    assert await provider.check_state(state)
+    # without replay checks, a state can be used more than once
+    assert await provider.check_state(state)
+
+    payload, _, signature = state.rpartition('.')
+    assert not await provider.check_state(f'{payload}.{signature[:-1]}x')
+    assert not await provider.check_state(f'0.{payload.split(".")[1]}.{signature}')
+    assert not await HMACStateProvider(SecretStr('other')).check_state(state)
+    assert not await provider.check_state('foobar')
+    assert not await provider.check_state('1.2.é')
+    assert not await provider.check_state(f'{payload}.{signature[:-1]}é')
+
+    expired = HMACStateProvider(SecretStr('secret'), max_age=timedelta(seconds=-1))
+    assert not await expired.check_state(await expired.new_state())
+
+
+async def test_hmac_state_provider_replay():
+    provider = HMACStateProvider(SecretStr('secret'), check_replay=True, max_nonces=2)
+    states = [await provider.new_state() for _ in range(3)]
+    assert await provider.check_state(states[0])
+    assert not await provider.check_state(states[0])
+    assert await provider.check_state(states[1])
+    assert await provider.check_state(states[2])
+    # the oldest nonce is forgotten once more than max_nonces are remembered
+    assert len(provider._nonces) == 2
+
+
+async def test_exchange_hmac_state(httpx_client: httpx.AsyncClient):
+    provider = GitHubAuthProvider(
+        httpx_client=httpx_client,
+        github_client_id='1234',
+        github_client_secret=SecretStr('secret'),
+        state_provider=HMACStateProvider(SecretStr('secret')),
+    )
+    url = await provider.authorization_url()
+    exchange = await provider.exchange_code('good', url.rsplit('=', 1)[-1])
+    assert exchange.access_token == 'good_token'
+    with pytest.raises(AuthError, match='^Invalid GitHub auth state'):
+        await provider.exchange_code('good', 'bad_state')
+
+
+async def test_hmac_state_provider_many():
+    jwt_provider, hmac_provider = StateProvider(SecretStr('secret')), HMACStateProvider(SecretStr('secret'))
+    states = [await hmac_provider.new_state() for _ in range(500)]
+    assert len(set(states)) == 500
+    for state in states:
+        assert await hmac_provider.check_state(state)
+        assert not await jwt_provider.check_state(state)
+    # HMAC states are shorter than JWTs, so the authorization URL is too
+    assert len(states[0]) < len(await jwt_provider.new_state())
+
+
 async def test_create():
     async with GitHubAuthProvider.create('foo', SecretStr('bar')) as provider:
         assert isinstance(provider._httpx_client, httpx.AsyncClient)
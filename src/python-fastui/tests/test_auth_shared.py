@@ -1,9 +1,20 @@
 import pytest
 from fastapi import FastAPI
 from fastui.auth import AuthError, AuthRedirect, fastapi_auth_exception_handling
+from fastui.auth.shared import AuthException, _redirect_body
 from starlette.testclient import TestClient
 
 
+class CustomAuthException(AuthException):
+    def response_data(self) -> tuple[int, str]:
+        return 403, '{"detail": "custom"}'
+
+
+class CustomAuthRedirect(AuthRedirect):
+    def response_data(self) -> tuple[int, str]:
+        return 302, '{"detail": "custom redirect"}'
+
+
 @pytest.fixture(name='app')
 def app_fixture() -> FastAPI:
     app = FastAPI()
@@ -17,6 +28,14 @@ def app_fixture() -> FastAPI:
     async def do_error():
         raise AuthError('error message', code='error-code')
 
+    @app.post('/do-custom/')
+    async def do_custom():
+        raise CustomAuthException()
+
+    @app.post('/do-custom-redirect/')
+    async def do_custom_redirect():
+        raise CustomAuthRedirect('/new-path')
+
     return app
 
 
@@ -37,3 +56,28 @@ def test_auth_error(client: TestClient):
     r = client.post('/do-error/')
     assert r.status_code == 401
     assert r.json() == {'detail': 'error message'}
+
+
+def test_auth_redirect_cached(client: TestClient):
+    _redirect_body.cache_clear()
+    first = client.post('/do-redirect/')
+    second = client.post('/do-redirect/')
+    assert first.content == second.content
+    assert _redirect_body.cache_info().hits == 1
+    assert _redirect_body.cache_info().misses == 1
+
+    assert AuthRedirect('/new-path').response_data() == (345, first.text)
+    assert AuthRedirect('/new-path', 'message').response_body()[1] != first.content
+
+
+def test_custom_auth_exception(client: TestClient):
+    r = client.post('/do-custom/')
+    assert r.status_code == 403
+    assert r.json() == {'detail': 'custom'}
+
+
+def test_custom_auth_redirect(client: TestClient):
+    assert CustomAuthRedirect('/new-path').response_body() == (302, b'{"detail": "custom redirect"}')
+    r = client.post('/do-custom-redirect/', follow_redirects=False)
+    assert r.status_code == 302
+    assert r.json() == {'detail': 'custom redirect'}
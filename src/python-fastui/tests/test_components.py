@@ -4,8 +4,9 @@ Simple tests of component creation.
 NOTE: we do NOT want to exhaustively construct every component just for the same of it -
 that's just testing pydantic!
 """
+import pytest
 from fastui import FastUI, components
-from pydantic import HttpUrl
+from pydantic import HttpUrl, ValidationError
 
 
 def test_div_text():
@@ -61,3 +62,36 @@ def test_iframe():
         'srcdoc': '<p>hello world</p>',
         'sandbox': 'allow-scripts',
     }
+
+
+def test_trusted_components_not_revalidated():
+    text = components.Text(text='hello world')
+    children = [text, components.Div(components=[])]
+
+    div = components.Div(components=children)
+    assert div.components == children
+    assert div.components[0] is text
+
+    m = FastUI(root=children)
+    assert m.root == children
+
+    # the list itself is copied, so changing one doesn't change the other
+    children.append(components.Text(text='another'))
+    assert len(div.components) == 2
+    assert len(m.root) == 2
+
+
+def test_untrusted_components_validated():
+    div = components.Div(components=[{'type': 'Text', 'text': 'hello world'}])
+    assert div.components == [components.Text(text='hello world')]
+
+    with pytest.raises(ValidationError):
+        components.Div(components=[components.Text(text='hello world'), {'type': 'Text'}])
+
+
+def test_cursor_pagination():
+    pagination = components.CursorPagination(next_cursor='abc', prev_cursor='')
+
+    assert FastUI(root=[pagination]).model_dump(by_alias=True, exclude_none=True) == [
+        {'nextCursor': 'abc', 'prevCursor': '', 'cursorQueryParam': 'cursor', 'type': 'CursorPagination'}
+    ]
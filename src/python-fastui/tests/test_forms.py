@@ -1,13 +1,36 @@
 import enum
 from contextlib import asynccontextmanager
 from io import BytesIO
-from typing import Annotated, Union
+from typing import Annotated, Any, Literal, Union
 
 import pytest
-from fastapi import HTTPException
+from fastapi import FastAPI, HTTPException
 from fastui import components
-from fastui.forms import FormFile, Textarea, fastui_form
+from fastui.components.forms import FormField, FormFieldArray, FormFieldUnion
+from fastui.forms import (
+    AcceptMatcher,
+    FormFile,
+    Textarea,
+    _form_adapter,
+    fastui_form,
+    form_file_fields,
+    name_to_loc,
+    sniff_content_type,
+    unflatten,
+)
+from fastui.json_schema import (
+    ARRAY_INDEX,
+    FormNameRegistry,
+    form_names,
+    json_schema_obj_to_fields,
+    model_fields_cache_clear,
+    model_fields_cache_info,
+    model_json_schema_to_fields,
+    model_union_variant_fields,
+)
+from httpx import AsyncClient
 from pydantic import BaseModel, Field
+from pydantic_core import PydanticCustomError
 from starlette.datastructures import FormData, Headers, UploadFile
 
 
@@ -545,3 +568,803 @@ def test_form_fields():
         'submitUrl': '/foobar/',
         'type': 'ModelForm',
     }
+
+
+def test_form_fields_cached():
+    class CachedForm(BaseModel):
+        name: str
+
+    model_fields_cache_clear()
+    m = components.ModelForm(model=CachedForm, submit_url='/foobar/')
+    first = m.model_dump(by_alias=True, exclude_none=True)
+    assert model_fields_cache_info().misses == 1
+    assert model_fields_cache_info().hits == 0
+
+    m = components.ModelForm(model=CachedForm, submit_url='/foobar/')
+    assert m.model_dump(by_alias=True, exclude_none=True) == first
+    assert model_fields_cache_info().misses == 1
+    assert model_fields_cache_info().hits == 1
+
+    model_fields_cache_clear()
+    assert model_fields_cache_info().currsize == 0
+
+
+class StreamedBody:
+    """
+    Multipart body sent in chunks, recording how many chunks the server has read.
+    """
+
+    boundary = 'fastui-boundary'
+
+    def __init__(self, parts: list[tuple[str, Union[str, tuple[str, str, bytes]]]], chunk_size: int = 1024):
+        body = b''
+        for name, value in parts:
+            body += f'--{self.boundary}\r\n'.encode()
+            if isinstance(value, str):
+                body += f'Content-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'.encode()
+            else:
+                filename, content_type, content = value
+                body += (
+                    f'Content-Disposition: form-data; name="{name}"; filename="{filename}"\r\n'
+                    f'Content-Type: {content_type}\r\n\r\n'
+                ).encode()
+                body += content + b'\r\n'
+        body += f'--{self.boundary}--\r\n'.encode()
+        self.chunks = [body[i : i + chunk_size] for i in range(0, len(body), chunk_size)]
+        self.chunks_read = 0
+
+    @property
+    def headers(self) -> dict[str, str]:
+        return {'content-type': f'multipart/form-data; boundary={self.boundary}'}
+
+    async def __aiter__(self):
+        for chunk in self.chunks:
+            self.chunks_read += 1
+            yield chunk
+
+
+class StreamingForm(BaseModel):
+    name: str
+    profile_pic: Annotated[UploadFile, FormFile(accept='image/*', max_size=16_000)]
+
+
+@pytest.fixture
+def streaming_app() -> FastAPI:
+    app = FastAPI()
+
+    @app.post('/')
+    async def submit(form: Annotated[StreamingForm, fastui_form(StreamingForm, streaming=True, spool_max_size=1024)]):
+        content = await form.profile_pic.read()
+        return {'name': form.name, 'filename': form.profile_pic.filename, 'size': len(content)}
+
+    return app
+
+
+async def test_streaming_submit(streaming_app: FastAPI):
+    body = StreamedBody([('name', 'foo'), ('profile_pic', ('pic.png', 'image/png', b'x' * 10_000))])
+    async with AsyncClient(app=streaming_app, base_url='http://test') as client:
+        r = await client.post('/', content=body, headers=body.headers)
+    assert r.status_code == 200, r.text
+    assert r.json() == {'name': 'foo', 'filename': 'pic.png', 'size': 10_000}
+
+
+async def test_streaming_submit_too_big(streaming_app: FastAPI):
+    body = StreamedBody([('profile_pic', ('pic.png', 'image/png', b'x' * 1_000_000)), ('name', 'foo')])
+    async with AsyncClient(app=streaming_app, base_url='http://test') as client:
+        r = await client.post('/', content=body, headers=body.headers)
+    assert r.status_code == 422, r.text
+    assert r.json() == {
+        'detail': {
+            'form': [
+                {
+                    'type': 'file_too_big',
+                    'loc': ['profile_pic'],
+                    'msg': 'File size exceeds maximum allowed size of 15.6KiB',
+                }
+            ]
+        }
+    }
+    # parsing stopped soon after the limit was reached
+    assert body.chunks_read < 20
+
+
+async def test_streaming_submit_wrong_type(streaming_app: FastAPI):
+    body = StreamedBody([('profile_pic', ('notes.txt', 'text/plain', b'x' * 100_000))])
+    async with AsyncClient(app=streaming_app, base_url='http://test') as client:
+        r = await client.post('/', content=body, headers=body.headers)
+    assert r.status_code == 422, r.text
+    assert r.json()['detail']['form'][0]['type'] == 'accept_mismatch'
+    assert body.chunks_read == 1
+
+
+async def test_streaming_submit_invalid_field(streaming_app: FastAPI):
+    body = StreamedBody([('profile_pic', ('pic.png', 'image/png', b'x'))])
+    async with AsyncClient(app=streaming_app, base_url='http://test') as client:
+        r = await client.post('/', content=body, headers=body.headers)
+    assert r.status_code == 422, r.text
+    assert r.json() == {'detail': {'form': [{'type': 'missing', 'loc': ['name'], 'msg': 'Field required'}]}}
+
+
+def test_form_file_fields():
+    class Nested(BaseModel):
+        doc: Annotated[UploadFile, FormFile(accept='.pdf')]
+
+    class Model(BaseModel):
+        pic: Annotated[UploadFile, FormFile(accept='image/*')]
+        nested: Nested
+        name: str
+
+    assert {k: v.accept for k, v in form_file_fields(Model).items()} == {'pic': 'image/*', 'nested.doc': '.pdf'}
+
+
+class TwoFilesForm(BaseModel):
+    first: Annotated[UploadFile, FormFile(max_size=10_000)]
+    second: Annotated[UploadFile, FormFile(max_size=10_000)]
+
+
+async def test_streaming_total_file_size():
+    app = FastAPI()
+
+    @app.post('/')
+    async def submit(
+        form: Annotated[TwoFilesForm, fastui_form(TwoFilesForm, streaming=True, max_total_file_size=15_000)]
+    ):
+        return {'first': form.first.size, 'second': form.second.size}
+
+    body = StreamedBody(
+        [('first', ('a.bin', 'application/octet-stream', b'x' * 8_000)), ('second', ('b.bin', 'x/y', b'x' * 800_000))]
+    )
+    async with AsyncClient(app=app, base_url='http://test') as client:
+        r = await client.post('/', content=body, headers=body.headers)
+    assert r.status_code == 422, r.text
+    assert r.json() == {
+        'detail': {
+            'form': [
+                {
+                    'type': 'files_too_big',
+                    'loc': ['second'],
+                    'msg': 'Total size of uploaded files exceeds maximum allowed size of 14.6KiB',
+                }
+            ]
+        }
+    }
+    assert body.chunks_read < 20
+
+
+async def test_total_file_size():
+    file1 = UploadFile(BytesIO(b'x' * 8_000), size=8_000, filename='a.bin')
+    file2 = UploadFile(BytesIO(b'x' * 8_000), size=8_000, filename='b.bin')
+    request = FakeRequest([('first', file1), ('second', file2)])
+
+    with pytest.raises(HTTPException) as exc_info:
+        await fastui_form(TwoFilesForm, max_total_file_size=15_000).dependency(request)
+
+    assert exc_info.value.detail == {
+        'form': [
+            {
+                'type': 'files_too_big',
+                'loc': ('second',),
+                'msg': 'Total size of uploaded files exceeds maximum allowed size of 14.6KiB',
+            }
+        ]
+    }
+
+    m = await fastui_form(TwoFilesForm, max_total_file_size=16_000).dependency(request)
+    assert m.model_dump() == {'first': file1, 'second': file2}
+
+
+async def test_file_constrained_submit_empty():
+    # no file selected
+    file = UploadFile(BytesIO(b''), size=0, filename='')
+    m = await fastui_form(FormWithFileConstraint).dependency(FakeRequest([('profile_pic', file)]))
+    assert m.model_dump() == {'profile_pic': file}
+
+    # an empty file is still checked against accept
+    file = UploadFile(BytesIO(b''), size=0, filename='empty.txt', headers=Headers({'content-type': 'text/plain'}))
+    with pytest.raises(HTTPException) as exc_info:
+        await fastui_form(FormWithFileConstraint).dependency(FakeRequest([('profile_pic', file)]))
+    assert exc_info.value.detail['form'][0]['type'] == 'accept_mismatch'
+
+
+PNG_BYTES = b'\x89PNG\r\n\x1a\n' + b'\x00' * 100
+
+
+class SniffForm(BaseModel):
+    files: Annotated[list[UploadFile], FormFile(accept='image/*', sniff=True)]
+
+
+def test_sniff_content_type():
+    file = UploadFile(BytesIO(PNG_BYTES), size=len(PNG_BYTES), filename='image.txt')
+    assert sniff_content_type(file) == 'image/png'
+    # the file position isn't changed
+    assert file.file.tell() == 0
+    assert sniff_content_type(UploadFile(BytesIO(b'hello'), size=5)) is None
+
+
+async def test_sniff_submit():
+    headers = Headers({'content-type': 'text/plain'})
+    files = [
+        UploadFile(BytesIO(PNG_BYTES), size=len(PNG_BYTES), filename=f'{i}.txt', headers=headers) for i in range(5)
+    ]
+
+    m = await fastui_form(SniffForm).dependency(FakeRequest([('files', f) for f in files]))
+    assert m.files == files
+
+    # without sniffing the client's content type is used
+    with pytest.raises(HTTPException):
+        await fastui_form(FormWithFileConstraint).dependency(FakeRequest([('profile_pic', files[0])]))
+
+
+async def test_sniff_submit_mismatch():
+    headers = Headers({'content-type': 'image/png'})
+    pdf = UploadFile(BytesIO(b'%PDF-1.7\n'), size=9, filename='image.png', headers=headers)
+    png = UploadFile(BytesIO(PNG_BYTES), size=len(PNG_BYTES), filename='image.png', headers=headers)
+
+    with pytest.raises(HTTPException) as exc_info:
+        await fastui_form(SniffForm).dependency(FakeRequest([('files', png), ('files', pdf)]))
+
+    assert exc_info.value.detail == {
+        'form': [
+            {
+                'type': 'accept_mismatch',
+                'loc': ('files',),
+                'msg': (
+                    'Uploaded file "image.png" with content type "application/pdf" '
+                    'does not match accept criteria "image/*"'
+                ),
+            }
+        ]
+    }
+
+
+@pytest.mark.parametrize('streaming', [False, True])
+async def test_sniff_submit_request(streaming: bool):
+    app = FastAPI()
+
+    @app.post('/')
+    async def submit(form: Annotated[SniffForm, fastui_form(SniffForm, streaming=streaming)]):
+        return {'filenames': [f.filename for f in form.files]}
+
+    # the client's content type is wrong, so this only passes if the files are sniffed
+    body = StreamedBody([('files', (f'{i}.txt', 'text/plain', PNG_BYTES)) for i in range(2)])
+    async with AsyncClient(app=app, base_url='http://test') as client:
+        r = await client.post('/', content=body, headers=body.headers)
+    assert r.status_code == 200, r.text
+    assert r.json() == {'filenames': ['0.txt', '1.txt']}
+
+
+@pytest.mark.parametrize(
+    'content,filename,content_type,accept',
+    [
+        (
+            b'PK\x03\x04' + b'\x00' * 100,
+            'report.docx',
+            'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+            'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        ),
+        (b'\x00\x00\x00\x18ftypheic' + b'\x00' * 100, 'photo.heic', 'image/heic', 'image/*'),
+        (b'\x00\x00\x00\x18ftypmif1' + b'\x00' * 100, 'photo', 'application/octet-stream', 'image/*'),
+        (b'\x00\x00\x00\x20ftypM4A ' + b'\x00' * 100, 'song.m4a', 'audio/mp4', 'audio/*'),
+        (b'\x00\x00\x00\x20ftypdash' + b'\x00' * 100, 'song.m4a', 'audio/mp4', 'audio/*'),
+    ],
+)
+def test_sniff_container_formats(content: bytes, filename: str, content_type: str, accept: str):
+    file = UploadFile(
+        BytesIO(content), size=len(content), filename=filename, headers=Headers({'content-type': content_type})
+    )
+    FormFile(accept=accept, sniff=True).validate_single(file)
+
+
+def test_sniff_container_mismatch():
+    # a zip file sent as an image is rejected, since neither the sniffed nor the client's content type match
+    content = b'PK\x03\x04' + b'\x00' * 100
+    file = UploadFile(
+        BytesIO(content), size=len(content), filename='a', headers=Headers({'content-type': 'text/plain'})
+    )
+    with pytest.raises(PydanticCustomError, match='content type "text/plain"'):
+        FormFile(accept='image/*', sniff=True).validate_single(file)
+
+    # but the client's content type isn't checked if the sniffed type is specific
+    file = UploadFile(
+        BytesIO(PNG_BYTES), size=len(PNG_BYTES), filename='a', headers=Headers({'content-type': 'audio/mp4'})
+    )
+    with pytest.raises(PydanticCustomError, match='content type "image/png"'):
+        FormFile(accept='audio/*', sniff=True).validate_single(file)
+
+
+def test_accept_matcher():
+    matcher = AcceptMatcher('image/*, .PDF,.tar.gz, text/csv')
+    assert matcher.extensions == {'.pdf', '.tar.gz'}
+    assert matcher.mime_types == {'text/csv'}
+    assert matcher.mime_prefixes == {'image/'}
+    assert matcher.accept == 'image/*,.PDF,.tar.gz,text/csv'
+
+    assert matcher.matches('photo.jpg', 'image/jpeg')
+    assert matcher.matches('report.pdf', None)
+    assert matcher.matches('backup.2024.tar.gz', 'application/gzip')
+    assert matcher.matches('data', 'Text/CSV')
+    assert not matcher.matches('notes.txt', 'text/plain')
+    assert not matcher.matches('notes', None)
+    assert matcher.stats == {'accepted': 4, 'content_type': 1, 'no_content_type': 1}
+
+    assert AcceptMatcher('*/*').matches(None, None)
+
+
+def test_form_file_accept_stats():
+    form_file = FormFile(accept='image/*')
+    png = UploadFile(BytesIO(b'x'), size=1, filename='a.png')
+    txt = UploadFile(BytesIO(b'x'), size=1, filename='a.txt')
+    form_file.validate_single(png)
+    with pytest.raises(PydanticCustomError):
+        form_file.validate_single(txt)
+    assert form_file.accept_matcher is not None
+    assert form_file.accept_matcher.stats == {'accepted': 1, 'content_type': 1}
+
+
+def test_unflatten():
+    form_data = FormData(
+        [
+            ('name', 'foo'),
+            ('empty', ''),
+            ('tags', 'a'),
+            ('tags', 'b'),
+            ('rows.0.x', '1'),
+            ('rows.0.y', '2'),
+            ('rows.1.x', '3'),
+            ('["dotted.name", 0]', '4'),
+            # sparse and out of order indexes are compacted in order
+            ('sparse.1000000', 'c'),
+            ('sparse.7', 'b'),
+            ('sparse.3', 'a'),
+            # mixed keys stay as a dict
+            ('mixed.0', 'x'),
+            ('mixed.y', 'y'),
+        ]
+    )
+    assert unflatten(form_data) == {
+        'name': 'foo',
+        'tags': ['a', 'b'],
+        'rows': [{'x': '1', 'y': '2'}, {'x': '3'}],
+        'dotted.name': ['4'],
+        'sparse': ['a', 'b', 'c'],
+        'mixed': {0: 'x', 'y': 'y'},
+    }
+
+
+def test_unflatten_large_form():
+    """
+    Benchmark-sized form: a 50x40 matrix plus JSON encoded names, ~2,200 fields.
+    """
+    rows, cols = 50, 40
+    items = [(f'matrix.{r}.{c}', str(r * c)) for r in range(rows) for c in range(cols)]
+    items += [(f'["lines", {i}, "a.b"]', str(i)) for i in range(200)]
+
+    result = unflatten(FormData(items))
+    assert result['matrix'] == [[str(r * c) for c in range(cols)] for r in range(rows)]
+    assert result['lines'] == [{'a.b': str(i)} for i in range(200)]
+
+
+def test_form_name_registry():
+    registry = FormNameRegistry(maxsize=2)
+    registry.add('a.b', ('a', 'b'))
+    registry.add('c', ('c',))
+    assert registry.loc('a.b') == ('a', 'b')
+    assert registry.name(('c',)) == 'c'
+
+    # 'a.b' was used least recently
+    registry.loc('c')
+    registry.add('d', ('d',))
+    assert len(registry) == 2
+    assert registry.loc('a.b') is None
+    assert registry.name(('a', 'b')) is None
+    assert registry.name(('d',)) == 'd'
+
+
+def test_form_names_shared():
+    class Nested(BaseModel):
+        x: int
+
+    class Model(BaseModel):
+        nested_thing: Nested
+
+    form_names.clear()
+    components.ModelForm(model=Model, submit_url='/').model_dump()
+    assert form_names.loc('nested_thing.x') == ('nested_thing', 'x')
+    assert name_to_loc('nested_thing.x') == ['nested_thing', 'x']
+
+    # submitted names are parsed, but not added to the registry
+    assert form_names.loc('other.0') is None
+    assert name_to_loc('other.0') == ['other', 0]
+    assert form_names.loc('other.0') is None
+
+
+async def test_submitted_names_dont_change_rendered_names():
+    class Model(BaseModel):
+        name: str
+
+    form_names.clear()
+    # a client can submit the JSON encoded form of a name
+    assert unflatten(FormData([('["name"]', 'x')])) == {'name': 'x'}
+
+    # which doesn't change the name rendered
+    fields = components.ModelForm(model=Model, submit_url='/').model_dump(by_alias=True)['formFields']
+    assert [f['name'] for f in fields] == ['name']
+    m = await fastui_form(Model).dependency(FakeRequest([('name', 'y')]))
+    assert m.model_dump() == {'name': 'y'}
+
+
+async def test_form_adapter():
+    adapter = _form_adapter(FormWithNested)
+    assert adapter is not None
+    assert adapter.locs == {'name': ('name',), 'nested.x': ('nested', 'x')}
+
+    form_data = FormData([('name', 'bar'), ('nested.x', '123'), ('empty', '')])
+    assert adapter.model_data(form_data) == {'name': 'bar', 'nested': {'x': '123'}}
+
+    # unknown fields aren't dropped, the form data is passed to unflatten instead
+    form_data = FormData([('name', 'bar'), ('nested.x', '123'), ('unknown', 'x'), ('empty', '')])
+    assert (
+        adapter.model_data(form_data)
+        == unflatten(form_data)
+        == {
+            'name': 'bar',
+            'nested': {'x': '123'},
+            'unknown': 'x',
+        }
+    )
+
+    m = await fastui_form(FormWithNested).dependency(FakeRequest([('name', 'bar'), ('nested.x', '123'), ('y', '1')]))
+    assert m.model_dump() == {'name': 'bar', 'nested': {'x': 123}}
+
+
+def test_form_adapter_fallback():
+    class AllowExtra(BaseModel, extra='allow'):
+        name: str
+
+    class WithTuple(BaseModel):
+        foo: tuple[str, int]
+
+    assert _form_adapter(AllowExtra) is None
+    assert _form_adapter(WithTuple) is None
+
+
+async def test_form_adapter_uncovered_fields():
+    class WithDict(BaseModel):
+        name: str
+        f: dict[str, int]
+
+    # dict fields have no form fields, so their data would be dropped by the adapter
+    assert _form_adapter(WithDict) is None
+    request = FakeRequest([('name', 'x'), ('f.a', '1'), ('f.b', '2')])
+    m = await fastui_form(WithDict).dependency(request)
+    assert m.model_dump() == {'name': 'x', 'f': {'a': 1, 'b': 2}}
+
+    class NestedDict(BaseModel):
+        name: str
+        nested: Union[WithDict, None] = None
+
+    assert _form_adapter(NestedDict) is None
+
+
+async def test_form_adapter_generation_error():
+    class WithAny(BaseModel):
+        name: str
+        data: Any = None
+
+    # the form fields can't be generated, but the dependency still works
+    assert _form_adapter(WithAny) is None
+    m = await fastui_form(WithAny).dependency(FakeRequest([('name', 'x'), ('data', 'y')]))
+    assert m.model_dump() == {'name': 'x', 'data': 'y'}
+
+
+async def test_form_adapter_forbid_extra_spelling():
+    class ForbidExtra(BaseModel, extra='forbid'):
+        name: str
+
+    m = await fastui_form(ForbidExtra).dependency(FakeRequest([('["name"]', 'x')]))
+    assert m.model_dump() == {'name': 'x'}
+
+
+class ForbidExtraForm(BaseModel, extra='forbid'):
+    name: str
+    profile_pic: Annotated[UploadFile, FormFile()]
+
+
+async def test_form_adapter_forbid_extra():
+    request = FakeRequest([('name', 'bar'), ('nope', '1')])
+    with pytest.raises(HTTPException) as exc_info:
+        await fastui_form(ForbidExtraForm).dependency(request)
+
+    assert exc_info.value.detail == {
+        'form': [{'type': 'extra_forbidden', 'loc': ('nope',), 'msg': 'Extra inputs are not permitted'}]
+    }
+
+
+async def test_streaming_forbid_extra():
+    app = FastAPI()
+
+    @app.post('/')
+    async def submit(form: Annotated[ForbidExtraForm, fastui_form(ForbidExtraForm, streaming=True)]):
+        return {'name': form.name}
+
+    body = StreamedBody([('nope', ('a.bin', 'x/y', b'x' * 100_000)), ('name', 'foo')])
+    async with AsyncClient(app=app, base_url='http://test') as client:
+        r = await client.post('/', content=body, headers=body.headers)
+    assert r.status_code == 422, r.text
+    assert r.json() == {
+        'detail': {'form': [{'type': 'extra_forbidden', 'loc': ['nope'], 'msg': 'Extra inputs are not permitted'}]}
+    }
+    assert body.chunks_read == 1
+
+
+class Geo(BaseModel):
+    lat: float
+    lng: float
+
+
+class Address(BaseModel):
+    city: str
+    geo: Geo
+
+
+class AddressesForm(BaseModel):
+    home: Address
+    work: Union[Address, None] = Field(default=None, title='Office')
+    places: tuple[Address, Address]
+
+
+def test_repeated_defs_form_fields():
+    fields = model_json_schema_to_fields(AddressesForm)
+    assert [(f.name, f.title, f.required) for f in fields] == [
+        ('home.city', ['Address', 'City'], True),
+        ('home.geo.lat', ['Address', 'Geo', 'Lat'], True),
+        ('home.geo.lng', ['Address', 'Geo', 'Lng'], True),
+        ('work.city', ['Office', 'City'], True),
+        ('work.geo.lat', ['Office', 'Geo', 'Lat'], True),
+        ('work.geo.lng', ['Office', 'Geo', 'Lng'], True),
+        ('places.0.city', ['Places', 'Address', 'City'], True),
+        ('places.0.geo.lat', ['Places', 'Address', 'Geo', 'Lat'], True),
+        ('places.0.geo.lng', ['Places', 'Address', 'Geo', 'Lng'], True),
+        ('places.1.city', ['Places', 'Address', 'City'], True),
+        ('places.1.geo.lat', ['Places', 'Address', 'Geo', 'Lat'], True),
+        ('places.1.geo.lng', ['Places', 'Address', 'Geo', 'Lng'], True),
+    ]
+
+    # templates don't change the generated fields
+    schema = AddressesForm.model_json_schema()
+    assert list(json_schema_obj_to_fields(schema, [], [], schema['$defs'])) == list(fields)
+
+
+class OrderLine(BaseModel):
+    sku: str
+    quantity: int = 1
+    note: str = Field(default='', alias='note.text')
+
+
+class OrderForm(BaseModel):
+    reference: str
+    lines: list[OrderLine] = Field(min_length=1, max_length=500)
+
+
+def test_array_form_fields():
+    m = components.ModelForm(model=OrderForm, submit_url='/foo/')
+    # insert_assert(m.model_dump(by_alias=True, exclude_none=True)['formFields'])
+    assert m.model_dump(by_alias=True, exclude_none=True)['formFields'] == [
+        {
+            'name': 'reference',
+            'title': ['Reference'],
+            'required': True,
+            'locked': False,
+            'htmlType': 'text',
+            'type': 'FormFieldInput',
+        },
+        {
+            'name': 'lines',
+            'title': ['Lines'],
+            'required': True,
+            'locked': False,
+            'itemFields': [
+                {
+                    'name': 'lines.{index}.sku',
+                    'title': ['Lines', 'Sku'],
+                    'required': True,
+                    'locked': False,
+                    'htmlType': 'text',
+                    'type': 'FormFieldInput',
+                },
+                {
+                    'name': 'lines.{index}.quantity',
+                    'title': ['Lines', 'Quantity'],
+                    'required': False,
+                    'locked': False,
+                    'htmlType': 'number',
+                    'initial': 1,
+                    'type': 'FormFieldInput',
+                },
+                {
+                    'name': '["lines", {index}, "note.text"]',
+                    'title': ['Lines', 'Note.Text'],
+                    'required': False,
+                    'locked': False,
+                    'htmlType': 'text',
+                    'initial': '',
+                    'type': 'FormFieldInput',
+                },
+            ],
+            'minItems': 1,
+            'maxItems': 500,
+            'type': 'FormFieldArray',
+        },
+    ]
+
+
+async def test_array_form_submit():
+    request = FakeRequest(
+        [
+            ('reference', 'abc'),
+            ('lines.0.sku', 'x'),
+            ('["lines", 0, "note.text"]', 'fragile'),
+            ('lines.1.sku', 'y'),
+            ('lines.1.quantity', '3'),
+        ]
+    )
+
+    m = await fastui_form(OrderForm).dependency(request)
+    assert m.model_dump(by_alias=True) == {
+        'reference': 'abc',
+        'lines': [{'sku': 'x', 'quantity': 1, 'note.text': 'fragile'}, {'sku': 'y', 'quantity': 3, 'note.text': ''}],
+    }
+
+
+def test_nested_array_form_fields():
+    class NestedArrays(BaseModel):
+        orders: list[OrderForm]
+
+    m = components.ModelForm(model=NestedArrays, submit_url='/foo/')
+    with pytest.raises(NotImplementedError, match='Nested arrays of objects are not yet supported'):
+        m.model_dump(by_alias=True, exclude_none=True)
+
+
+def test_repeated_defs_with_array_form_fields():
+    class Orders(BaseModel):
+        a: OrderForm
+        b: OrderForm
+
+    m = components.ModelForm(model=Orders, submit_url='/foo/')
+    fields = m.model_dump(by_alias=True, exclude_none=True)['formFields']
+    assert [f['name'] for f in fields] == ['a.reference', 'a.lines', 'b.reference', 'b.lines']
+    assert [f['name'] for f in fields[1]['itemFields']] == [
+        'a.lines.{index}.sku',
+        'a.lines.{index}.quantity',
+        '["a", "lines", {index}, "note.text"]',
+    ]
+    assert [f['name'] for f in fields[3]['itemFields']] == [
+        'b.lines.{index}.sku',
+        'b.lines.{index}.quantity',
+        '["b", "lines", {index}, "note.text"]',
+    ]
+
+
+class EmailNotification(BaseModel):
+    kind: Literal['email']
+    address: str
+
+
+class WebhookNotification(BaseModel):
+    kind: Literal['webhook']
+    url: str
+    retries: int = 3
+
+
+Notification = Annotated[Union[EmailNotification, WebhookNotification], Field(discriminator='kind')]
+
+
+class NotificationForm(BaseModel):
+    name: str
+    notification: Notification = Field(json_schema_extra={'variants_url': '/api/variants'})
+
+
+def test_union_form_fields():
+    m = components.ModelForm(model=NotificationForm, submit_url='/foo/')
+    # insert_assert(m.model_dump(by_alias=True, exclude_none=True)['formFields'][1])
+    assert m.model_dump(by_alias=True, exclude_none=True)['formFields'][1] == {
+        'name': 'notification.kind',
+        'title': ['Notification'],
+        'required': True,
+        'locked': False,
+        'options': [
+            {'value': 'email', 'label': 'EmailNotification'},
+            {'value': 'webhook', 'label': 'WebhookNotification'},
+        ],
+        'variantsUrl': '/api/variants',
+        'type': 'FormFieldUnion',
+    }
+
+    fields = model_union_variant_fields(NotificationForm, 'notification.kind', 'webhook')
+    assert [(f.name, f.title, f.required) for f in fields] == [
+        ('notification.url', ['Notification', 'Url'], True),
+        ('notification.retries', ['Notification', 'Retries'], False),
+    ]
+
+    with pytest.raises(ValueError, match="Unknown variant 'sms'"):
+        model_union_variant_fields(NotificationForm, 'notification.kind', 'sms')
+    with pytest.raises(ValueError, match="NotificationForm has no union field 'name'"):
+        model_union_variant_fields(NotificationForm, 'name', 'email')
+
+
+def test_union_form_fields_inline():
+    class InlineUnionForm(BaseModel):
+        notification: Union[Notification, None] = None
+
+    [field] = model_json_schema_to_fields(InlineUnionForm)
+    assert field.required is False
+    assert {k: [f.name for f in v] for k, v in field.variant_fields.items()} == {
+        'email': ['notification.address'],
+        'webhook': ['notification.url', 'notification.retries'],
+    }
+
+
+def test_union_in_array_variant_fields():
+    class NotificationsForm(BaseModel):
+        notifications: list[NotificationForm]
+
+    fields = model_union_variant_fields(NotificationsForm, 'notifications.2.notification.kind', 'email')
+    assert [f.name for f in fields] == ['notifications.2.notification.address']
+
+
+async def test_union_in_array_submit():
+    class SmsNotification(BaseModel):
+        kind: Literal['sms']
+        number: str = Field(alias='phone.number')
+
+    class Recipient(BaseModel):
+        name: str
+        notification: Annotated[Union[EmailNotification, SmsNotification], Field(discriminator='kind')]
+
+    class RecipientsForm(BaseModel):
+        recipients: list[Recipient]
+
+    [array] = model_json_schema_to_fields(RecipientsForm)
+    assert isinstance(array, FormFieldArray)
+    union = array.item_fields[1]
+    assert isinstance(union, FormFieldUnion)
+    assert union.name == 'recipients.{index}.notification.kind'
+    # variant fields are named with the same unquoted placeholder, which the browser replaces with the row index
+    assert {k: [f.name for f in v] for k, v in union.variant_fields.items()} == {
+        'email': ['recipients.{index}.notification.address'],
+        'sms': ['["recipients", {index}, "notification", "phone.number"]'],
+    }
+
+    def row(index: int, field: FormField, value: str) -> tuple[str, str]:
+        return field.name.replace(ARRAY_INDEX, str(index)), value
+
+    email, sms = union.variant_fields['email'][0], union.variant_fields['sms'][0]
+    request = FakeRequest(
+        [
+            row(0, array.item_fields[0], 'alice'),
+            row(0, union, 'email'),
+            row(0, email, 'alice@example.com'),
+            row(1, array.item_fields[0], 'bob'),
+            row(1, union, 'sms'),
+            row(1, sms, '555'),
+        ]
+    )
+    m = await fastui_form(RecipientsForm).dependency(request)
+    assert m.model_dump(by_alias=True) == {
+        'recipients': [
+            {'name': 'alice', 'notification': {'kind': 'email', 'address': 'alice@example.com'}},
+            {'name': 'bob', 'notification': {'kind': 'sms', 'phone.number': '555'}},
+        ]
+    }
+
+
+async def test_union_form_submit():
+    request = FakeRequest(
+        [('name', 'alerts'), ('notification.kind', 'webhook'), ('notification.url', 'https://example.com')]
+    )
+
+    m = await fastui_form(NotificationForm).dependency(request)
+    assert m.model_dump() == {
+        'name': 'alerts',
+        'notification': {'kind': 'webhook', 'url': 'https://example.com', 'retries': 3},
+    }
@@ -0,0 +1,176 @@
+from itertools import count
+
+from fastui import components
+from fastui.pagination import Paginated, paginate, paginate_async
+from pydantic import BaseModel
+
+
+class Row(BaseModel):
+    id: int
+
+
+rows = [Row(id=i) for i in range(1, 26)]
+
+
+def test_sequence_first_page():
+    p = paginate(rows, page=1, page_size=10)
+    assert [r.id for r in p.rows] == list(range(1, 11))
+    assert p.total == 25
+    assert p.total_is_estimate is False
+
+
+def test_sequence_last_page():
+    p = paginate(rows, page=3, page_size=10)
+    assert [r.id for r in p.rows] == list(range(21, 26))
+    assert p.total == 25
+
+
+def test_sequence_past_end():
+    p = paginate(rows, page=5, page_size=10)
+    assert p.rows == []
+    assert p.total == 25
+
+
+def test_page_below_one():
+    p = paginate(rows, page=0, page_size=10)
+    assert p.page == 1
+    assert [r.id for r in p.rows] == list(range(1, 11))
+
+
+def test_iterator_consumed_lazily():
+    ids = count(1)
+    p = paginate((Row(id=i) for i in ids), page=2, page_size=10)
+    assert [r.id for r in p.rows] == list(range(11, 21))
+    # one extra row is consumed to check for a next page
+    assert next(ids) == 22
+    assert p.total == 21
+    assert p.total_is_estimate is True
+
+
+def test_iterator_last_page():
+    p = paginate(iter(rows), page=3, page_size=10)
+    assert [r.id for r in p.rows] == list(range(21, 26))
+    assert p.total == 25
+    assert p.total_is_estimate is False
+
+
+def test_iterator_past_end():
+    # the rows before the page are counted, so the total is exact
+    p = paginate(iter(rows), page=5, page_size=10)
+    assert p.rows == []
+    assert p.total == 25
+    assert p.total_is_estimate is False
+
+    p = paginate(iter(rows[:20]), page=3, page_size=10)
+    assert p.rows == []
+    assert p.total == 20
+    assert p.total_is_estimate is False
+
+
+def test_iterator_total():
+    calls = []
+
+    def total() -> int:
+        calls.append(1)
+        return 25
+
+    p = paginate(iter(rows), page=1, page_size=10, total=total)
+    assert p.total == 25
+    assert p.total_is_estimate is False
+    assert calls == [1]
+
+    # total isn't counted on the last page
+    paginate(iter(rows), page=3, page_size=10, total=total)
+    assert calls == [1]
+
+
+def test_iterator_estimate():
+    p = paginate(iter(rows), page=1, page_size=10, estimate=lambda: 1_000)
+    assert p.total == 1_000
+    assert p.total_is_estimate is True
+
+    # estimate is increased so there's always a next page when there are more rows
+    p = paginate(iter(rows), page=2, page_size=10, estimate=lambda: 5)
+    assert p.total == 21
+    assert p.total_is_estimate is True
+
+
+async def test_async():
+    fetches = []
+
+    async def fetch(offset: int, limit: int) -> list[Row]:
+        fetches.append((offset, limit))
+        return rows[offset : offset + limit]
+
+    async def count_rows() -> int:
+        return len(rows)
+
+    p = await paginate_async(fetch, page=2, page_size=10, count=count_rows)
+    assert [r.id for r in p.rows] == list(range(11, 21))
+    assert p.total == 25
+    assert fetches == [(10, 11)]
+
+
+async def test_async_estimate():
+    async def fetch(offset: int, limit: int) -> list[Row]:
+        return rows[offset : offset + limit]
+
+    async def estimate() -> int:
+        return 30
+
+    p = await paginate_async(fetch, page=1, page_size=10, estimate=estimate)
+    assert p.total == 30
+    assert p.total_is_estimate is True
+
+    p = await paginate_async(fetch, page=4, page_size=10, estimate=estimate)
+    assert p.rows == []
+    assert p.total == 30
+
+
+async def test_async_past_end():
+    async def fetch(offset: int, limit: int) -> list[Row]:
+        return rows[offset : offset + limit]
+
+    # without a count, the total is at most the rows before this page
+    p = await paginate_async(fetch, page=4, page_size=10)
+    assert p.rows == []
+    assert p.total == 30
+    assert p.total_is_estimate is True
+
+
+def test_components():
+    p = paginate(rows, page=2, page_size=10)
+    assert isinstance(p, Paginated)
+    table = p.table()
+    assert isinstance(table, components.Table)
+    assert len(table.data) == 10
+
+    assert p.pagination(page_query_param='p').model_dump(by_alias=True, exclude_none=True) == {
+        'page': 2,
+        'pageSize': 10,
+        'total': 25,
+        'totalIsEstimate': False,
+        'pageQueryParam': 'p',
+        'type': 'Pagination',
+        'pageCount': 3,
+    }
+
+
+def test_components_estimate():
+    p = paginate(iter(rows), page=1, page_size=10)
+    assert p.pagination().model_dump(by_alias=True, exclude_none=True) == {
+        'page': 1,
+        'pageSize': 10,
+        'total': 11,
+        'totalIsEstimate': True,
+        'pageQueryParam': 'page',
+        'type': 'Pagination',
+        'pageCount': 2,
+    }
+
+
+def test_iterator_exact_page_size():
+    p = paginate(iter(rows[:10]), page=1, page_size=10)
+    assert len(p.rows) == 10
+    assert p.total == 10
+    assert p.total_is_estimate is False
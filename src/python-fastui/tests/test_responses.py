@@ -0,0 +1,57 @@
+import json
+
+from fastapi import FastAPI
+from fastui import FastUI, components
+from fastui.responses import stream_components
+from httpx import AsyncClient
+
+
+def page_components(count: int):
+    yield components.PageTitle(text='Cities')
+    for i in range(count):
+        yield components.Paragraph(text=f'city {i}')
+
+
+async def test_stream_matches_response_model():
+    app = FastAPI()
+
+    @app.get('/model/', response_model=FastUI, response_model_exclude_none=True)
+    def model_endpoint():
+        return list(page_components(100))
+
+    @app.get('/stream/')
+    def stream_endpoint():
+        return stream_components(page_components(100), chunk_size=256)
+
+    async with AsyncClient(app=app, base_url='http://test') as client:
+        r_model = await client.get('/model/')
+        r_stream = await client.get('/stream/')
+
+    assert r_stream.status_code == 200
+    assert r_stream.headers['content-type'] == 'application/json'
+    assert r_stream.json() == r_model.json()
+    assert len(r_stream.json()) == 101
+
+
+async def test_stream_chunks():
+    chunks = [chunk async for chunk in stream_components(page_components(100), chunk_size=256).body_iterator]
+    assert len(chunks) > 1
+    assert all(len(chunk) < 300 for chunk in chunks)
+    assert json.loads(b''.join(chunks))[1] == {'text': 'city 0', 'type': 'Paragraph'}
+
+
+async def test_stream_async():
+    async def gen():
+        for component in page_components(3):
+            yield component
+
+    chunks = [chunk async for chunk in stream_components(gen()).body_iterator]
+    assert chunks == [
+        b'[{"text":"Cities","type":"PageTitle"},{"text":"city 0","type":"Paragraph"},'
+        b'{"text":"city 1","type":"Paragraph"},{"text":"city 2","type":"Paragraph"}]'
+    ]
+
+
+async def test_stream_empty():
+    chunks = [chunk async for chunk in stream_components([]).body_iterator]
+    assert chunks == [b'[]']
@@ -0,0 +1,172 @@
+import asyncio
+import json
+
+import pytest
+from fastui import components
+from fastui.components.display import DisplayLookup
+from fastui.sse import (
+    Differ,
+    append_components,
+    append_rows,
+    append_text,
+    components_event,
+    diff,
+    patch_event,
+    sse_response,
+)
+from pydantic import BaseModel
+
+
+class Row(BaseModel):
+    id: int
+    name: str
+    secret: str = 'hidden'
+
+
+def event_data(event: str):
+    assert event.startswith('data: ')
+    assert event.endswith('\n\n')
+    return json.loads(event[6:])
+
+
+def test_components_event():
+    assert event_data(components_event([components.Text(text='hello')])) == [{'text': 'hello', 'type': 'Text'}]
+
+
+def test_append_rows():
+    table = components.Table(data=[], data_model=Row, columns=[DisplayLookup(field='id'), DisplayLookup(field='name')])
+    ops = append_rows([1], table, [Row(id=1, name='a'), Row(id=2, name='b')])
+    assert event_data(patch_event(ops)) == {
+        'patch': [
+            {'op': 'append', 'path': [1, 'data'], 'value': [{'id': 1, 'name': 'a'}, {'id': 2, 'name': 'b'}]},
+        ]
+    }
+
+
+def test_append_rows_columnar():
+    table = components.Table(data=[], data_model=Row, columns=[DisplayLookup(field='name')], columnar=True)
+    ops = append_rows([0], table, [Row(id=1, name='a'), Row(id=2, name='b')])
+    assert ops == [{'op': 'append', 'path': [0, 'data', 'name'], 'value': ['a', 'b']}]
+
+
+def test_append_components():
+    ops = append_components([0, 'components'], [components.Text(text='hello')])
+    assert ops == [{'op': 'append', 'path': [0, 'components'], 'value': [{'text': 'hello', 'type': 'Text'}]}]
+
+
+def test_append_text():
+    ops = append_text([0], ' world')
+    assert ops == [{'op': 'append', 'path': [0, 'text'], 'value': ' world'}]
+    assert event_data(patch_event(ops)) == {'patch': [{'op': 'append', 'path': [0, 'text'], 'value': ' world'}]}
+
+
+def test_differ_text():
+    differ = Differ()
+    assert event_data(differ.event([components.Markdown(text='Hello')])) == [{'text': 'Hello', 'type': 'Markdown'}]
+    assert event_data(differ.event([components.Markdown(text='Hello world')])) == {
+        'patch': [{'op': 'append', 'path': [0, 'text'], 'value': ' world'}]
+    }
+    assert differ.event([components.Markdown(text='Hello world')]) is None
+    assert event_data(differ.event([components.Markdown(text='Goodbye')])) == {
+        'patch': [{'op': 'replace', 'path': [0, 'text'], 'value': 'Goodbye'}]
+    }
+
+    differ.reset()
+    assert event_data(differ.event([components.Markdown(text='Goodbye')])) == [{'text': 'Goodbye', 'type': 'Markdown'}]
+
+
+def test_differ_components():
+    differ = Differ()
+    differ.event([components.Div(components=[components.Text(text='a')], class_name='x')])
+    event = differ.event([components.Div(components=[components.Text(text='a'), components.Text(text='b')])])
+    assert event_data(event) == {
+        'patch': [
+            {'op': 'append', 'path': [0, 'components'], 'value': [{'text': 'b', 'type': 'Text'}]},
+            {'op': 'remove', 'path': [0, 'className']},
+        ]
+    }
+    # the list shrinking replaces everything
+    assert event_data(differ.event([])) == []
+
+
+def test_diff():
+    assert diff({'type': 'Text', 'text': 'a'}, {'type': 'Heading', 'text': 'a'}) == [
+        {'op': 'replace', 'path': [], 'value': {'type': 'Heading', 'text': 'a'}}
+    ]
+    assert diff([1, {'type': 'X', 'a': 1}], [2, {'type': 'X', 'a': 1, 'b': 2}], [0]) == [
+        {'op': 'replace', 'path': [0, 0], 'value': 2},
+        {'op': 'replace', 'path': [0, 1, 'b'], 'value': 2},
+    ]
+
+
+async def markdown_source(count: int, delay: float = 0):
+    text = ''
+    for i in range(count):
+        if delay:
+            await asyncio.sleep(delay)
+        text += f'{i} '
+        yield [components.Markdown(text=text)]
+
+
+async def stream_events(response) -> list[str]:
+    body = ''.join([chunk async for chunk in response.body_iterator])
+    return body.split('\n\n')[:-1]
+
+
+async def test_sse_response():
+    response = sse_response(markdown_source(3, delay=0.001), heartbeat=None, retry=500)
+    assert response.media_type == 'text/event-stream'
+    assert response.headers['cache-control'] == 'no-cache'
+    assert await stream_events(response) == [
+        'retry: 500',
+        'id: 1\ndata: [{"text":"0 ","type":"Markdown"}]',
+        'id: 2\ndata: {"patch":[{"op":"append","path":[0,"text"],"value":"1 "}]}',
+        'id: 3\ndata: {"patch":[{"op":"append","path":[0,"text"],"value":"2 "}]}',
+    ]
+
+
+async def test_sse_response_resume():
+    response = sse_response(markdown_source(3, delay=0.001), last_event_id='1', heartbeat=None)
+    assert await stream_events(response) == [
+        'id: 2\ndata: [{"text":"0 1 ","type":"Markdown"}]',
+        'id: 3\ndata: {"patch":[{"op":"append","path":[0,"text"],"value":"2 "}]}',
+    ]
+
+
+async def test_sse_response_resume_factory():
+    starts = []
+
+    async def source(start: int):
+        starts.append(start)
+        yield [components.Text(text=f'from {start}')]
+
+    response = sse_response(source, last_event_id='5', heartbeat=None)
+    assert await stream_events(response) == ['id: 6\ndata: [{"text":"from 5","type":"Text"}]']
+    assert starts == [5]
+
+
+async def test_sse_response_coalesce():
+    # the source never waits, so only the latest component list is sent
+    response = sse_response(markdown_source(100), heartbeat=None)
+    events = await stream_events(response)
+    assert len(events) < 100
+    assert events[-1].startswith('id: 100\n')
+
+
+async def test_sse_response_heartbeat():
+    response = sse_response(markdown_source(2, delay=0.05), heartbeat=0.01)
+    events = await stream_events(response)
+    assert ': ping' in events
+    assert [e for e in events if e != ': ping'] == [
+        'id: 1\ndata: [{"text":"0 ","type":"Markdown"}]',
+        'id: 2\ndata: {"patch":[{"op":"append","path":[0,"text"],"value":"1 "}]}',
+    ]
+
+
+async def test_sse_response_error():
+    async def source():
+        yield [components.Text(text='hello')]
+        raise RuntimeError('broken')
+
+    with pytest.raises(RuntimeError, match='broken'):
+        await stream_events(sse_response(source(), heartbeat=None))
@@ -1,6 +1,9 @@
+from typing import Union
+
 import pytest
 from fastui import components
 from fastui.components import display
+from fastui.events import GoToEvent
 from pydantic import BaseModel, Field, computed_field
 
 
@@ -80,6 +83,82 @@ def test_table_empty_data_model():
     }
 
 
+def test_table_projected_fields():
+    table = components.Table(
+        data=users,
+        columns=[display.DisplayLookup(field='name', on_click=GoToEvent(url='/users/{id}/'))],
+    )
+
+    # insert_assert(table.model_dump(by_alias=True, exclude_none=True))
+    assert table.model_dump(by_alias=True, exclude_none=True) == {
+        'data': [{'id': 1, 'name': 'john'}, {'id': 2, 'name': 'jack'}],
+        'columns': [{'onClick': {'url': '/users/{id}/', 'type': 'go-to'}, 'field': 'name', 'title': 'Name'}],
+        'type': 'Table',
+    }
+
+
+def test_details_projected_fields():
+    d = components.Details(
+        data=users[0],
+        fields=[
+            display.DisplayLookup(field='representation'),
+            display.Display(value='edit', on_click=GoToEvent(url='/users/{id}/edit/')),
+        ],
+    )
+
+    # insert_assert(d.model_dump(by_alias=True, exclude_none=True))
+    assert d.model_dump(by_alias=True, exclude_none=True) == {
+        'data': {'id': 1, 'representation': '1: john'},
+        'fields': [
+            {'field': 'representation'},
+            {'onClick': {'url': '/users/{id}/edit/', 'type': 'go-to'}, 'value': 'edit', 'type': 'Display'},
+        ],
+        'type': 'Details',
+    }
+
+
+def test_table_columnar():
+    table = components.Table(
+        data=users,
+        columns=[
+            display.DisplayLookup(field='name', on_click=GoToEvent(url='/users/{id}/')),
+            display.DisplayLookup(field='representation'),
+        ],
+        columnar=True,
+    )
+
+    # insert_assert(table.model_dump(by_alias=True, exclude_none=True))
+    assert table.model_dump(by_alias=True, exclude_none=True) == {
+        'data': {'name': ['john', 'jack'], 'id': [1, 2], 'representation': ['1: john', '2: jack']},
+        'columns': [
+            {'onClick': {'url': '/users/{id}/', 'type': 'go-to'}, 'field': 'name', 'title': 'Name'},
+            {'field': 'representation', 'title': 'Representation'},
+        ],
+        'columnar': True,
+        'type': 'Table',
+    }
+
+
+def test_table_columnar_none_values():
+    class Pet(BaseModel):
+        name: str
+        owner: Union[str, None] = None
+
+    table = components.Table(data=[Pet(name='rex'), Pet(name='tom', owner='jerry')], columnar=True)
+
+    # none values are kept so columns stay aligned
+    assert table.model_dump_json(by_alias=True, exclude_none=True) == (
+        '{"data":{"name":["rex","tom"],"owner":[null,"jerry"]},'
+        '"columns":[{"field":"name"},{"field":"owner"}],"columnar":true,"type":"Table"}'
+    )
+
+
+def test_table_columnar_empty():
+    table = components.Table(data=[], data_model=User, columns=[display.DisplayLookup(field='id')], columnar=True)
+
+    assert table.model_dump(by_alias=True, exclude_none=True)['data'] == {'id': []}
+
+
 def test_display_no_fields():
     d = components.Details(data=users[0])
 
@@ -102,7 +181,7 @@ def test_display_fields():
 
     # insert_assert(d.model_dump(by_alias=True, exclude_none=True))
     assert d.model_dump(by_alias=True, exclude_none=True) == {
-        'data': {'id': 1, 'name': 'john', 'representation': '1: john'},
+        'data': {'id': 1, 'name': 'john'},
         'fields': [{'title': 'ID', 'field': 'id'}, {'title': 'Name', 'field': 'name'}],
         'type': 'Details',
     }
@@ -120,7 +199,7 @@ def test_details_with_display_lookup_and_display():
 
     # insert_assert(d.model_dump(by_alias=True, exclude_none=True))
     assert d.model_dump(by_alias=True, exclude_none=True) == {
-        'data': {'id': 1, 'name': 'john', 'representation': '1: john'},
+        'data': {'id': 1, 'name': 'john'},
         'fields': [
             {'title': 'ID', 'field': 'id'},
             {'title': 'Name', 'field': 'name'},